@@ -1,20 +1,27 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import os
+import sys
 from pathlib import Path
-from typing import List, Literal
+from typing import Dict, List, Literal, Optional, Tuple
 
+import httpx
 import instructor
-import networkx as nx
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
 from pydantic import Field
-from pyvis.network import Network
+from rapidfuzz import fuzz, process, utils
 
 from atomic_agents import AgentConfig, AtomicAgent, BaseIOSchema
 from atomic_agents.context import SystemPromptGenerator
 
+from visualmind.http_clients import build_async_http_client
+from visualmind.inputs import collect_inputs, output_path_for, read_document
+from visualmind.llm_cache import SQLiteCache
+from visualmind.render import VisData, build_vis_data, render_to_html, write_vis_json
+
 
 EntityType = Literal["person", "organization", "state"]
 
@@ -50,7 +57,7 @@ class EntityCandidate(DescribedIOSchema):
 class EntityExtractionOutput(DescribedIOSchema):
     """Collection of entity candidates detected in the document."""
 
-    entities: List[EntityCandidate] = Field(default_factory=list, description="Candidate entity list.")
+    entities: List[EntityCandidate] = Field(..., description="Candidate entity list.")
 
 
 class SynonymResolutionInput(DescribedIOSchema):
@@ -66,13 +73,13 @@ class CanonicalEntity(DescribedIOSchema):
     canonical_name: str = Field(..., description="Primary name for the deduplicated entity.")
     types: List[EntityType] = Field(..., min_length=1, description="One or more entity types for this record.")
     importance: float = Field(..., ge=0.0, le=1.0, description="Importance weight inherited from the text context.")
-    members: List[str] = Field(default_factory=list, description="Names or aliases merged into this canonical entity.")
+    members: List[str] = Field(..., description="Names or aliases merged into this canonical entity.")
 
 
 class SynonymResolutionOutput(DescribedIOSchema):
     """Normalized entity list after synonym merging."""
 
-    entities: List[CanonicalEntity] = Field(default_factory=list, description="Canonical entity records.")
+    entities: List[CanonicalEntity] = Field(..., description="Canonical entity records.")
 
 
 class RelationshipExtractionInput(DescribedIOSchema):
@@ -94,174 +101,408 @@ class RelationshipRecord(DescribedIOSchema):
 class RelationshipExtractionOutput(DescribedIOSchema):
     """Relationship set generated from the text."""
 
-    relationships: List[RelationshipRecord] = Field(default_factory=list, description="Directed relationships.")
+    relationships: List[RelationshipRecord] = Field(..., description="Directed relationships.")
 
 
-def _build_entity_agent(client: instructor.client.Instructor) -> AtomicAgent[EntityExtractionInput, EntityExtractionOutput]:
-    prompt = SystemPromptGenerator(
-        background=[
-            "You are an information extraction assistant focused on geopolitical text.",
-            "Your only job is to list the main people, organizations, or states referenced in the provided document.",
-        ],
-        steps=[
-            "Review the supplied text carefully.",
-            "Identify distinct entities that strongly influence the narrative.",
-            "Assign an importance score between 0 and 1 where higher means the document focuses on that entity.",
-        ],
-        output_instructions=[
-            "Never invent entities not mentioned in the text.",
-            "Only use the entity types person, organization, or state (all lowercase).",
-            "Return the entities in the order they matter to the document.",
-        ],
+class PipelineOutput(DescribedIOSchema):
+    """Entities, their canonical merge, and the relationships between them, produced in one pass."""
+
+    entities: List[EntityCandidate] = Field(..., description="Candidate entity list.")
+    canonical: List[CanonicalEntity] = Field(..., description="Canonical entity records after synonym merging.")
+    relationships: List[RelationshipRecord] = Field(
+        ..., description="Directed relationships between canonical_name values."
     )
+
+
+# Prompts are built once per process. Their rendered text is identical for every
+# request, which keeps the system-prompt prefix eligible for server-side caching.
+_AGENT_MODEL = "gpt-5-mini"
+# Strict tool calls let the API enforce the response schemas, so instructor no
+# longer needs validation retries for malformed output. Every output field is
+# required because strict schemas cannot carry defaults.
+_AGENT_MODE = instructor.Mode.TOOLS_STRICT
+
+_ENTITY_PROMPT = SystemPromptGenerator(
+    background=[
+        "You are an information extraction assistant focused on geopolitical text.",
+        "Your only job is to list the main people, organizations, or states referenced in the provided document.",
+    ],
+    steps=[
+        "Review the supplied text carefully.",
+        "Identify distinct entities that strongly influence the narrative.",
+        "Assign an importance score between 0 and 1 where higher means the document focuses on that entity.",
+    ],
+    output_instructions=[
+        "Never invent entities not mentioned in the text.",
+        "Only use the entity types person, organization, or state (all lowercase).",
+        "Return the entities in the order they matter to the document.",
+    ],
+)
+
+_SYNONYM_PROMPT = SystemPromptGenerator(
+    background=[
+        "You collapse duplicate entities so that graph analytics work on canonical nodes.",
+        "Two entries describe the same canonical entity if one is a synonym, alias, or obvious reference for the other in context.",
+    ],
+    steps=[
+        "Study the article text and the candidate list.",
+        "Cluster names that refer to the same underlying real-world actor.",
+        "It is important to merge the nodes that mean the same thing in the context, for example Vladimir Putin and Russia or Xi Jinping and China mean the same thing in geopolitical context.",
+        "Select a single canonical_name for each cluster and carry over representative metadata.",
+    ],
+    output_instructions=[
+        "Keep canonical_name strings consistent and human-readable.",
+        "List every alias you merged into members.",
+        "Use the allowed entity types only; multiple types should stay unique and in lowercase.",
+        "Importance must stay in [0,1]; inherit the max or average importance from the merged members.",
+    ],
+)
+
+_RELATIONSHIP_PROMPT = SystemPromptGenerator(
+    background=[
+        "You map directed relationships between previously defined canonical entities.",
+        "Only include relationships that the text states or clearly implies.",
+    ],
+    steps=[
+        "Review the text to understand how the canonical entities interact.",
+        "Map each interaction into a single directed edge with a short lowercase label.",
+        "Scale the weight to [0,1] based on how central the relationship is to the document.",
+    ],
+    output_instructions=[
+        "Do not invent entities; source/target must exactly match canonical_name values.",
+        "Skip edges that do not have both endpoints in the canonical list.",
+        "Use the strongest reading of directionality (actor -> recipient).",
+    ],
+)
+
+
+_PIPELINE_PROMPT = SystemPromptGenerator(
+    background=[
+        "You build entity relationship graphs from geopolitical text in a single pass.",
+        "You extract the main people, organizations, or states, merge synonyms into canonical entities, and map the relationships between them.",
+    ],
+    steps=[
+        "Review the supplied text carefully.",
+        "List the distinct entities that strongly influence the narrative in entities, scoring importance between 0 and 1.",
+        "Cluster entities that refer to the same real-world actor in context (for example Vladimir Putin and Russia, or Xi Jinping and China) into canonical records.",
+        "Map each interaction between canonical entities into a single directed edge with a short lowercase label, weighted in [0,1] by how central it is to the document.",
+    ],
+    output_instructions=[
+        "Never invent entities not mentioned in the text.",
+        "Only use the entity types person, organization, or state (all lowercase).",
+        "List every alias merged into a canonical record in members; importance is the max of the merged members.",
+        "Relationship source/target must exactly match canonical_name values; skip edges without both endpoints.",
+        "Use the strongest reading of directionality (actor -> recipient).",
+    ],
+)
+
+
+# Agents themselves are cheap to build but carry per-conversation chat history,
+# so they are created per document rather than shared.
+def _build_entity_agent(client: instructor.AsyncInstructor) -> AtomicAgent[EntityExtractionInput, EntityExtractionOutput]:
     return AtomicAgent[EntityExtractionInput, EntityExtractionOutput](
         config=AgentConfig(
             client=client,
-            model="gpt-5-mini",
-            system_prompt_generator=prompt,
+            model=_AGENT_MODEL,
+            mode=_AGENT_MODE,
+            system_prompt_generator=_ENTITY_PROMPT,
         ) # type: ignore
     )
 
 
 def _build_synonym_agent(
-    client: instructor.client.Instructor,
+    client: instructor.AsyncInstructor,
 ) -> AtomicAgent[SynonymResolutionInput, SynonymResolutionOutput]:
-    prompt = SystemPromptGenerator(
-        background=[
-            "You collapse duplicate entities so that graph analytics work on canonical nodes.",
-            "Two entries describe the same canonical entity if one is a synonym, alias, or obvious reference for the other in context.",
-        ],
-        steps=[
-            "Study the article text and the candidate list.",
-            "Cluster names that refer to the same underlying real-world actor.",
-            "It is important to merge the nodes that mean the same thing in the context, for example Vladimir Putin and Russia or Xi Jinping and China mean the same thing in geopolitical context."
-            "Select a single canonical_name for each cluster and carry over representative metadata.",
-        ],
-        output_instructions=[
-            "Keep canonical_name strings consistent and human-readable.",
-            "List every alias you merged into members.",
-            "Use the allowed entity types only; multiple types should stay unique and in lowercase.",
-            "Importance must stay in [0,1]; inherit the max or average importance from the merged members.",
-        ],
-    )
     return AtomicAgent[SynonymResolutionInput, SynonymResolutionOutput](
         config=AgentConfig(
             client=client,
-            model="gpt-5-mini",
-            system_prompt_generator=prompt,
+            model=_AGENT_MODEL,
+            mode=_AGENT_MODE,
+            system_prompt_generator=_SYNONYM_PROMPT,
         )
     )
 
 
 def _build_relationship_agent(
-    client: instructor.client.Instructor,
+    client: instructor.AsyncInstructor,
 ) -> AtomicAgent[RelationshipExtractionInput, RelationshipExtractionOutput]:
-    prompt = SystemPromptGenerator(
-        background=[
-            "You map directed relationships between previously defined canonical entities.",
-            "Only include relationships that the text states or clearly implies.",
-        ],
-        steps=[
-            "Review the text to understand how the canonical entities interact.",
-            "Map each interaction into a single directed edge with a short lowercase label.",
-            "Scale the weight to [0,1] based on how central the relationship is to the document.",
-        ],
-        output_instructions=[
-            "Do not invent entities; source/target must exactly match canonical_name values.",
-            "Skip edges that do not have both endpoints in the canonical list.",
-            "Use the strongest reading of directionality (actor -> recipient).",
-        ],
-    )
     return AtomicAgent[RelationshipExtractionInput, RelationshipExtractionOutput](
         config=AgentConfig(
             client=client,
-            model="gpt-5-mini",
-            system_prompt_generator=prompt,
+            model=_AGENT_MODEL,
+            mode=_AGENT_MODE,
+            system_prompt_generator=_RELATIONSHIP_PROMPT,
         )
     )
 
 
-def _build_client() -> instructor.client.Instructor:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY must be set before running the atomic-agents pipeline.")
-    return instructor.from_openai(OpenAI(api_key=api_key))
+def _build_pipeline_agent(
+    client: instructor.AsyncInstructor,
+) -> AtomicAgent[EntityExtractionInput, PipelineOutput]:
+    return AtomicAgent[EntityExtractionInput, PipelineOutput](
+        config=AgentConfig(
+            client=client,
+            model=_AGENT_MODEL,
+            mode=_AGENT_MODE,
+            system_prompt_generator=_PIPELINE_PROMPT,
+        )
+    )
 
 
-def _render_graph(entities: List[CanonicalEntity], relationships: List[RelationshipRecord], output_html: Path) -> None:
-    graph = nx.DiGraph()
-    for entity in entities:
-        graph.add_node(
-            entity.canonical_name,
-            type=", ".join(entity.types),
-            value=entity.importance,
-            members=", ".join(entity.members),
+# Surface forms this similar (after lowercasing and dropping punctuation, in any
+# word order) are treated as the same entity without asking the synonym agent.
+_FUZZY_MATCH_THRESHOLD = 90
+
+
+def _collapse_candidates(
+    candidates: List[EntityCandidate],
+) -> Tuple[List[EntityCandidate], Dict[str, List[str]]]:
+    """Merge exact, case-only, and near-identical duplicates before synonym resolution.
+
+    Only candidates of the same entity type are merged; the highest-importance
+    member represents each group. Returns the representatives in their original
+    order and, per representative name, the other surface forms folded into it.
+    """
+    group_index: Dict[Tuple[str, str], int] = {}
+    groups: List[List[EntityCandidate]] = []
+    for candidate in candidates:
+        key = (candidate.name.strip().casefold(), candidate.entity_type)
+        if key in group_index:
+            groups[group_index[key]].append(candidate)
+        else:
+            group_index[key] = len(groups)
+            groups.append([candidate])
+    heads = [max(group, key=lambda candidate: candidate.importance) for group in groups]
+
+    owner = list(range(len(heads)))
+    if len(heads) > 1:
+        names = [head.name for head in heads]
+        scores = process.cdist(
+            names,
+            names,
+            scorer=fuzz.token_sort_ratio,
+            processor=utils.default_process,
+            score_cutoff=_FUZZY_MATCH_THRESHOLD,
+            workers=-1,
         )
-
-    known_nodes = set(graph.nodes)
-    for relation in relationships:
-        if relation.source not in known_nodes or relation.target not in known_nodes:
+        assigned = set()
+        for i in sorted(range(len(heads)), key=lambda index: heads[index].importance, reverse=True):
+            if i in assigned:
+                continue
+            for j in scores[i].nonzero()[0]:
+                j = int(j)
+                if j not in assigned and heads[j].entity_type == heads[i].entity_type:
+                    owner[j] = i
+                    assigned.add(j)
+
+    representatives: List[EntityCandidate] = []
+    aliases: Dict[str, List[str]] = {}
+    for i, head in enumerate(heads):
+        if owner[i] != i:
             continue
-        graph.add_edge(
-            relation.source,
-            relation.target,
-            width=relation.weight,
-            title=relation.relationship,
-        )
+        representatives.append(head)
+        folded = [
+            candidate.name
+            for j, group in enumerate(groups)
+            if owner[j] == i
+            for candidate in group
+            if candidate.name != head.name
+        ]
+        if folded:
+            aliases[head.name] = list(dict.fromkeys(folded))
+    return representatives, aliases
+
+
+def _restore_aliases(entities: List[CanonicalEntity], aliases: Dict[str, List[str]]) -> None:
+    """Add the surface forms collapsed by :func:`_collapse_candidates` back to ``members``."""
+    if not aliases:
+        return
+    for entity in entities:
+        members = list(entity.members)
+        for name in (entity.canonical_name, *entity.members):
+            members.extend(aliases.get(name, ()))
+        entity.members = list(dict.fromkeys(members))
 
-    network = Network(directed=True)
-    network.from_nx(graph)
-    output_html.parent.mkdir(parents=True, exist_ok=True)
-    network.write_html(str(output_html))
+
+def _build_client(
+    cache: Optional[SQLiteCache] = None,
+    http_client: Optional[httpx.AsyncClient] = None,
+) -> instructor.AsyncInstructor:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY must be set before running the atomic-agents pipeline.")
+    # instructor consults the cache before every structured call, keyed on the
+    # model, messages, and response schema. Its attempts already cover transient
+    # API errors, so the SDK's own retries are turned off.
+    return instructor.from_openai(
+        AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0),
+        mode=_AGENT_MODE,
+        cache=cache,
+    )
+
+
+def _to_vis_json(entities: List[CanonicalEntity], relationships: List[RelationshipRecord]) -> VisData:
+    return build_vis_data(
+        [
+            {
+                "id": entity.canonical_name,
+                "label": entity.canonical_name,
+                "value": entity.importance,
+                "title": ", ".join(entity.members),
+            }
+            for entity in entities
+        ],
+        (
+            {
+                "from": relation.source,
+                "to": relation.target,
+                "width": relation.weight,
+                "title": relation.relationship,
+            }
+            for relation in relationships
+        ),
+    )
 
 
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Build a relationship graph using Atomic Agents.")
     parser.add_argument(
         "--input",
-        type=Path,
-        default=Path("data/sample_input_ch.txt"),
-        help="Path to the input text file.",
+        type=str,
+        default="data/sample_input_ch.txt",
+        help="Input text file, directory of .txt files, or glob pattern.",
     )
     parser.add_argument(
         "--output",
         type=Path,
-        default=Path("data/output_graph.html"),
-        help="Path to the HTML file that will store the PyVis graph.",
+        default=None,
+        help="Graph output path (default: data/output_graph.json, or data/output_graph.html with --html).",
+    )
+    parser.add_argument(
+        "--html",
+        action="store_true",
+        help="Write a standalone vis-network HTML page instead of the vis-network JSON payload.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=Path("data/llm_cache.sqlite3"),
+        help="SQLite file used to cache agent responses between runs.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the LLM, ignoring and not updating the cache.",
+    )
+    parser.add_argument(
+        "--multi-stage",
+        action="store_true",
+        help="Run separate entity, synonym, and relationship agents instead of one combined call.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of documents processed concurrently.",
     )
     return parser.parse_args()
 
 
-def main() -> None:
-    load_dotenv()
-    args = _parse_args()
-    text = args.input.read_text(encoding="utf-8").strip()
-
-    client = _build_client()
+async def process_doc(
+    client: instructor.AsyncInstructor,
+    text: str,
+) -> Tuple[EntityExtractionOutput, SynonymResolutionOutput, RelationshipExtractionOutput]:
+    """Run the entity -> synonym -> relationship chain for a single document."""
     entity_agent = _build_entity_agent(client)
     synonym_agent = _build_synonym_agent(client)
     relationship_agent = _build_relationship_agent(client)
 
-    entity_result = entity_agent.run(EntityExtractionInput(text=text))
-    canonical_result = synonym_agent.run(
-        SynonymResolutionInput(
+    entity_result = await entity_agent.run_async(EntityExtractionInput(text=text))
+    # The agent still handles cross-language and contextual synonyms; only
+    # duplicates that are obvious from the strings are removed up front.
+    candidates, aliases = _collapse_candidates(entity_result.entities)
+    canonical_result = await synonym_agent.run_async(
+        SynonymResolutionInput.model_construct(
             text=text,
-            candidates=entity_result.entities,
+            candidates=candidates,
         )
     )
-    relationship_result = relationship_agent.run(
-        RelationshipExtractionInput(
+    _restore_aliases(canonical_result.entities, aliases)
+    relationship_result = await relationship_agent.run_async(
+        RelationshipExtractionInput.model_construct(
             text=text,
             entities=canonical_result.entities,
         )
     )
+    return entity_result, canonical_result, relationship_result
+
+
+async def process_doc_single_call(
+    client: instructor.AsyncInstructor,
+    text: str,
+) -> Tuple[EntityExtractionOutput, SynonymResolutionOutput, RelationshipExtractionOutput]:
+    """Produce all three stages for a single document with one agent call.
+
+    The document is sent once instead of three times; prefer :func:`process_doc`
+    for very long documents, where one combined answer loses quality.
+    """
+    result = await _build_pipeline_agent(client).run_async(EntityExtractionInput(text=text))
+    # instructor has already validated every record; repackaging them must not
+    # run the validators a second time.
+    return (
+        EntityExtractionOutput.model_construct(entities=result.entities),
+        SynonymResolutionOutput.model_construct(entities=result.canonical),
+        RelationshipExtractionOutput.model_construct(relationships=result.relationships),
+    )
+
+
+async def _run(args: argparse.Namespace) -> int:
+    inputs = collect_inputs(args.input)
+    if not inputs:
+        print(f"No input files matched {args.input}", file=sys.stderr)
+        return 1
+
+    http_client = build_async_http_client()
+    client = _build_client(None if args.no_cache else SQLiteCache(args.cache), http_client)
+    semaphore = asyncio.Semaphore(max(1, args.concurrency))
+    multiple = len(inputs) > 1
+    pipeline = process_doc if args.multi_stage else process_doc_single_call
+
+    async def _process(path: Path) -> None:
+        async with semaphore:
+            text = read_document(path)
+            entity_result, canonical_result, relationship_result = await pipeline(client, text)
+
+        print(f"[{path}] Entities:", entity_result.model_dump_json(indent=2))
+        print(f"[{path}] Canonical Entities:", canonical_result.model_dump_json(indent=2))
+        print(f"[{path}] Relationships:", relationship_result.model_dump_json(indent=2))
+
+        output = output_path_for(args.output, path, multiple)
+        data = _to_vis_json(canonical_result.entities, relationship_result.relationships)
+        if args.html:
+            render_to_html(data, output)
+        else:
+            write_vis_json(data, output)
+        print(f"Graph written to {output}")
+
+    try:
+        results = await asyncio.gather(*(_process(path) for path in inputs), return_exceptions=True)
+    finally:
+        await http_client.aclose()
+    failures = 0
+    for path, result in zip(inputs, results):
+        if isinstance(result, Exception):
+            failures += 1
+            print(f"[{path}] Pipeline failed: {result}", file=sys.stderr)
+    return 1 if failures else 0
 
-    print("Entities:", entity_result.model_dump_json(indent=2))
-    print("Canonical Entities:", canonical_result.model_dump_json(indent=2))
-    print("Relationships:", relationship_result.model_dump_json(indent=2))
 
-    _render_graph(canonical_result.entities, relationship_result.relationships, args.output)
-    print(f"Graph written to {args.output}")
+def main() -> None:
+    load_dotenv()
+    args = _parse_args()
+    if args.output is None:
+        args.output = Path("data/output_graph.html" if args.html else "data/output_graph.json")
+    sys.exit(asyncio.run(_run(args)))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+import sys
+from typing import Any, Dict, List, Mapping, Tuple
+
+from codex_code.extraction import (
+    ENTITY_RESPONSE_FORMAT,
+    RELATIONSHIP_RESPONSE_FORMAT,
+    Entity,
+    Relationship,
+    build_entity_prompts,
+    build_relationship_prompts,
+    entities_from_payload,
+    relationships_from_payload,
+)
+from visualmind.batch import build_openai_client, submit_batch
+
+
+def batch_extract(
+    texts: Mapping[str, str],
+    *,
+    model: str,
+    client: Any = None,
+) -> Dict[str, Tuple[List[Entity], List[Relationship]]]:
+    """Extract entities, then relationships, for every document as two batch jobs."""
+    client = client or build_openai_client()
+
+    entity_payloads = submit_batch(
+        {doc_id: build_entity_prompts(text) for doc_id, text in texts.items()},
+        model=model,
+        response_format=ENTITY_RESPONSE_FORMAT,
+        client=client,
+    )
+    entities: Dict[str, List[Entity]] = {}
+    for doc_id, payload in entity_payloads.items():
+        try:
+            entities[doc_id] = entities_from_payload(payload)
+        except ValueError as exc:
+            print(f"{doc_id}: {exc}", file=sys.stderr)
+
+    relationship_payloads = submit_batch(
+        {
+            doc_id: build_relationship_prompts(texts[doc_id], doc_entities)
+            for doc_id, doc_entities in entities.items()
+        },
+        model=model,
+        response_format=RELATIONSHIP_RESPONSE_FORMAT,
+        client=client,
+    )
+    results: Dict[str, Tuple[List[Entity], List[Relationship]]] = {}
+    for doc_id, payload in relationship_payloads.items():
+        try:
+            relationships = relationships_from_payload(payload, entities[doc_id])
+        except ValueError as exc:
+            print(f"{doc_id}: {exc}", file=sys.stderr)
+            continue
+        results[doc_id] = (entities[doc_id], relationships)
+    return results
@@ -1,9 +1,18 @@
-import json
+import asyncio
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Sequence
+from functools import partial
+from typing import AbstractSet, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+import ijson
+import msgspec
+import orjson
 
-@dataclass
+from visualmind.chunking import chunk_text
+from visualmind.llm_cache import SQLiteCache, cached_complete, cached_stream
+from visualmind.streaming import ChunkReader
+
+
+@dataclass(slots=True)
 class Entity:
     """Represents a named entity extracted from free-form text."""
 
@@ -12,7 +21,7 @@ class Entity:
     importance: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Relationship:
     """Represents a relationship between two entities."""
 
@@ -25,7 +34,13 @@ class Relationship:
 class AISuiteLLM:
     """Thin wrapper around aisuite to issue structured prompts."""
 
-    def __init__(self, model: str = "openai:gpt-4o"):
+    def __init__(
+        self,
+        model: str = "openai:gpt-4o",
+        cache: Optional[SQLiteCache] = None,
+        http_client: Optional[Any] = None,
+    ):
+        """``http_client`` (an ``httpx.Client``) is shared by every OpenAI request."""
         try:
             from aisuite import Client  # type: ignore
         except ImportError as exc:  # pragma: no cover - aisuite required at runtime
@@ -34,165 +49,412 @@ class AISuiteLLM:
             ) from exc
 
         self._model = model
-        self._client = Client()
-        self._completions = getattr(self._client.chat, "completions", None)
-        if self._completions is None or not hasattr(self._completions, "create"):
+        self._cache = cache
+        # cached_complete retries transient errors itself, so the SDK must not also retry.
+        openai_config: Dict[str, Any] = {"max_retries": 0}
+        if http_client is not None:
+            openai_config["http_client"] = http_client
+        self._client = Client(provider_configs={"openai": openai_config})
+        completions = getattr(self._client.chat, "completions", None)
+        if completions is None or not hasattr(completions, "create"):
             raise RuntimeError(
                 "Unsupported aisuite version: chat completions interface not found."
             )
 
-    def complete(self, system_prompt: str, user_prompt: str) -> str:
-        """Send a chat completion request and return concatenated text output."""
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ]
+    @property
+    def model(self) -> str:
+        return self._model
+
+    def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Send a chat completion request and return its text.
+
+        ``response_format`` is forwarded to the provider, e.g. a JSON schema the
+        server should enforce. Caching and retries follow
+        :func:`visualmind.llm_cache.cached_complete`.
+        """
+        return cached_complete(
+            self._client,
+            self._model,
+            _messages(system_prompt, user_prompt),
+            cache=self._cache,
+            **_format_kwargs(response_format),
+        )
+
+    def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[str]:
+        """Yield response text as the model generates it."""
+        return cached_stream(
+            self._client,
+            self._model,
+            _messages(system_prompt, user_prompt),
+            cache=self._cache,
+            **_format_kwargs(response_format),
+        )
+
+
+def _messages(system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _format_kwargs(response_format: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    # Left out entirely when unset so plain prompts share cache entries.
+    return {"response_format": response_format} if response_format is not None else {}
+
+
+class AsyncAISuiteLLM(AISuiteLLM):
+    """AISuiteLLM variant whose requests can be awaited concurrently.
+
+    aisuite only ships a blocking client, so each request runs on the default
+    thread pool; overlapping requests this way hides the LLM round-trip latency.
+    """
+
+    async def acomplete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Awaitable counterpart of :meth:`AISuiteLLM.complete`."""
+        return await asyncio.to_thread(
+            partial(self.complete, response_format=response_format), system_prompt, user_prompt
+        )
+
+
+# Wire formats of the structured responses. msgspec validates and builds these in
+# a single C pass, straight from the response bytes.
+class _EntityRecord(msgspec.Struct):
+    name: str
+    type: str = ""
+    importance: float = 0.5
+
+
+class _RelationshipRecord(msgspec.Struct):
+    source: str
+    target: str
+    relation_type: str = ""
+    weight: float = 0.5
 
-        try:
-            response = self._completions.create(model=self._model, messages=messages)
-        except ModuleNotFoundError as exc:  # pragma: no cover
-            raise RuntimeError(
-                "The `openai` package is required. Install dependencies with `uv sync`."
-            ) from exc
-        except Exception as exc:  # pragma: no cover - surfaced at runtime
-            raise RuntimeError(f"LLM request failed: {exc}") from exc
 
-        choices = getattr(response, "choices", None)
-        if not choices:
-            return str(response)
+class _EntityResponse(msgspec.Struct):
+    entities: List[_EntityRecord]
 
-        first_choice = choices[0]
-        message = getattr(first_choice, "message", None)
-        if message is None:
-            return str(response)
 
-        content = getattr(message, "content", None)
-        if content is None:
-            return str(response)
+class _RelationshipResponse(msgspec.Struct):
+    relationships: List[_RelationshipRecord]
 
-        if isinstance(content, list):
-            chunks: List[str] = []
-            for part in content:
-                if isinstance(part, dict):
-                    text = part.get("text")
-                    if text:
-                        chunks.append(str(text))
-            if chunks:
-                return "".join(chunks)
-        elif isinstance(content, str):
-            return content
 
-        return str(content)
+_RECORD_TYPES: Dict[str, type] = {
+    "entities": _EntityRecord,
+    "relationships": _RelationshipRecord,
+}
+_DECODERS: Dict[str, msgspec.json.Decoder] = {
+    "entities": msgspec.json.Decoder(_EntityResponse),
+    "relationships": msgspec.json.Decoder(_RelationshipResponse),
+}
+
+
+def _decode_records(raw_response: str, key: str) -> List[Any]:
+    """Decode a ``{key: [...]}`` response into its list of records."""
+    try:
+        return getattr(_DECODERS[key].decode(raw_response), key)
+    except msgspec.DecodeError as exc:
+        raise ValueError(f"Failed to parse JSON response: {exc}") from exc
+
+
+def _convert_records(items: Any, key: str) -> List[Any]:
+    """Validate already-decoded JSON items (e.g. from the Batch API) as records."""
+    try:
+        return msgspec.convert(items, List[_RECORD_TYPES[key]])
+    except msgspec.ValidationError as exc:
+        raise ValueError(f"{key.capitalize()} extraction returned invalid records: {exc}") from exc
 
 
 def _parse_json_payload(
     llm: AISuiteLLM,
     system_prompt: str,
     user_prompt: str,
-    *,
-    max_attempts: int = 2,
-) -> Any:
-    """Prompt the LLM and parse a JSON payload with a single retry on failure."""
-    last_error: Exception | None = None
-    for attempt in range(1, max_attempts + 1):
-        raw_response = llm.complete(system_prompt, user_prompt)
-        cleaned = raw_response.strip().strip("`")
-        try:
-            return json.loads(cleaned)
-        except json.JSONDecodeError as exc:
-            last_error = exc
-            if attempt < max_attempts:
-                user_prompt = (
-                    f"{user_prompt}\n\n"
-                    "Reminder: respond with ONLY valid JSON. No commentary."
-                )
-    raise ValueError(f"Failed to parse JSON response: {last_error}") from last_error
-
-
-def _ensure_float(value: Any, default: float = 0.0) -> float:
+    response_format: Dict[str, Any],
+) -> List[Any]:
+    """Prompt the LLM under a server-enforced JSON schema and decode its records."""
+    raw_response = llm.complete(system_prompt, user_prompt, response_format=response_format)
+    return _decode_records(raw_response, response_format["json_schema"]["name"])
+
+
+def _stream_json_items(
+    llm: AISuiteLLM,
+    system_prompt: str,
+    user_prompt: str,
+    response_format: Dict[str, Any],
+) -> Iterator[Any]:
+    """Yield the records of a streamed ``{key: [...]}`` response as each one closes."""
+    key = response_format["json_schema"]["name"]
+    record_type = _RECORD_TYPES[key]
+    chunks = llm.stream(system_prompt, user_prompt, response_format=response_format)
     try:
-        number = float(value)
-    except (TypeError, ValueError):
-        return default
-    return max(0.0, min(1.0, number))
+        for item in ijson.items(ChunkReader(chunks), f"{key}.item", use_float=True):
+            yield msgspec.convert(item, record_type)
+    except ijson.JSONError as exc:
+        raise ValueError(f"Streamed JSON response was truncated or malformed: {exc}") from exc
+    except msgspec.ValidationError as exc:
+        raise ValueError(f"{key.capitalize()} extraction returned invalid records: {exc}") from exc
 
 
-def _coerce_entities(raw_entities: Iterable[Dict[str, Any]]) -> List[Entity]:
-    entities: List[Entity] = []
+async def _aparse_json_payload(
+    llm: AsyncAISuiteLLM,
+    system_prompt: str,
+    user_prompt: str,
+    response_format: Dict[str, Any],
+) -> List[Any]:
+    """Async counterpart of :func:`_parse_json_payload`."""
+    raw_response = await llm.acomplete(system_prompt, user_prompt, response_format=response_format)
+    return _decode_records(raw_response, response_format["json_schema"]["name"])
+
+
+def _unit_float(value: float) -> float:
+    return value if 0.0 <= value <= 1.0 else max(0.0, min(1.0, value))
+
+
+def _iter_entities(records: Iterable[_EntityRecord]) -> Iterator[Entity]:
+    # Keyed on casefolded (name, type); the first mention of each entity wins.
     seen = set()
-    for item in raw_entities:
-        name = str(item.get("name", "")).strip()
-        type_ = str(item.get("type", "")).strip()
+    for record in records:
+        name = record.name.strip()
         if not name:
             continue
-        key = (name.lower(), type_.lower())
-        if key in seen:
+        type_ = record.type.strip()
+        key = (name.casefold(), type_.casefold())
+        if key not in seen:
+            seen.add(key)
+            yield Entity(name, type_, _unit_float(record.importance))
+
+
+def _coerce_entities(records: Iterable[_EntityRecord]) -> List[Entity]:
+    return list(_iter_entities(records))
+
+
+def _iter_relationships(
+    records: Iterable[_RelationshipRecord],
+    entity_names: AbstractSet[str],
+) -> Iterator[Relationship]:
+    for record in records:
+        source = record.source.strip()
+        target = record.target.strip()
+        if source not in entity_names or target not in entity_names:
             continue
-        seen.add(key)
-        importance = _ensure_float(item.get("importance"), default=0.5)
-        entities.append(Entity(name=name, type=type_, importance=importance))
-    return entities
+        relation_type = record.relation_type.strip() or "related"
+        yield Relationship(source, target, relation_type, _unit_float(record.weight))
 
 
 def _coerce_relationships(
-    raw_relationships: Iterable[Dict[str, Any]],
-    valid_entities: Sequence[Entity],
+    records: Iterable[_RelationshipRecord],
+    entity_names: AbstractSet[str],
 ) -> List[Relationship]:
-    entity_names = {entity.name for entity in valid_entities}
-    relationships: List[Relationship] = []
-    for item in raw_relationships:
-        source = str(item.get("source", "")).strip()
-        target = str(item.get("target", "")).strip()
-        relation_type = str(item.get("relation_type", "")).strip()
-        if not source or not target or source not in entity_names or target not in entity_names:
-            continue
-        weight = _ensure_float(item.get("weight"), default=0.5)
-        relationships.append(
-            Relationship(
-                source=source,
-                target=target,
-                relation_type=relation_type or "related",
-                weight=weight,
-            )
-        )
-    return relationships
+    return list(_iter_relationships(records, entity_names))
 
 
-def extract_entities(text: str, llm: AISuiteLLM) -> List[Entity]:
-    """Infer entities from text via the LLM."""
+def _json_schema_format(name: str, item_properties: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap an item schema as a strict ``{name: [item, ...]}`` response format."""
+    item_schema = {
+        "type": "object",
+        "properties": item_properties,
+        "required": list(item_properties),
+        "additionalProperties": False,
+    }
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {name: {"type": "array", "items": item_schema}},
+                "required": [name],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+ENTITY_RESPONSE_FORMAT = _json_schema_format(
+    "entities",
+    {
+        "name": {"type": "string"},
+        "type": {"type": "string"},
+        "importance": {"type": "number", "minimum": 0, "maximum": 1},
+    },
+)
+
+RELATIONSHIP_RESPONSE_FORMAT = _json_schema_format(
+    "relationships",
+    {
+        "source": {"type": "string"},
+        "target": {"type": "string"},
+        "relation_type": {"type": "string"},
+        "weight": {"type": "number", "minimum": 0, "maximum": 1},
+    },
+)
+
+
+def _unwrap_list(payload: Any, key: str) -> List[Any]:
+    """Accept either a bare JSON array or the ``{key: [...]}`` structured-output form."""
+    if isinstance(payload, dict):
+        payload = payload.get(key)
+    if not isinstance(payload, list):
+        raise ValueError(f"{key.capitalize()} extraction returned a non-list payload.")
+    return payload
+
+
+def entities_from_payload(payload: Any) -> List[Entity]:
+    """Validate a decoded entity-extraction response."""
+    return _coerce_entities(_convert_records(_unwrap_list(payload, "entities"), "entities"))
+
+
+def relationships_from_payload(payload: Any, entities: Sequence[Entity]) -> List[Relationship]:
+    """Validate a decoded relationship-extraction response against known entities."""
+    entity_names = {entity.name for entity in entities}
+    records = _convert_records(_unwrap_list(payload, "relationships"), "relationships")
+    return _coerce_relationships(records, entity_names)
+
+
+def build_entity_prompts(text: str) -> Tuple[str, str]:
+    """Return the (system, user) prompt pair for entity extraction."""
     system_prompt = (
         "You are an information extraction assistant. Extract entities from text. "
         "Return ONLY valid JSON. No prose."
     )
     user_prompt = (
-        "Given the following text, list key entities as a JSON array of objects with "
-        '`name`, `type`, and `importance` (float 0-1). Use lowercase type labels '
+        "Given the following text, list key entities under an `entities` array of "
+        'objects with `name`, `type`, and `importance` (float 0-1). Use lowercase type labels '
         '(e.g., \"person\", \"organization\"). Importance measures relevance.\n\n'
-        f"Text:\n{text}\n\nJSON array:"
+        f"Text:\n{text}"
     )
-    raw_entities = _parse_json_payload(llm, system_prompt, user_prompt)
-    if not isinstance(raw_entities, list):
-        raise ValueError("Entity extraction returned a non-list payload.")
-    return _coerce_entities(raw_entities)
+    return system_prompt, user_prompt
 
 
-def extract_relationships(
-    text: str, entities: Sequence[Entity], llm: AISuiteLLM
-) -> List[Relationship]:
-    """Infer relationships between entities, given the source text."""
-    entity_json = json.dumps([entity.__dict__ for entity in entities], ensure_ascii=False)
+def entities_to_json(entities: Sequence[Entity]) -> str:
+    """Serialize entities compactly for inclusion in a prompt."""
+    return orjson.dumps(list(entities)).decode("utf-8")
+
+
+def build_relationship_prompts(
+    text: str,
+    entities: Sequence[Entity],
+    *,
+    entity_json: Optional[str] = None,
+) -> Tuple[str, str]:
+    """Return the (system, user) prompt pair for relationship extraction.
+
+    Pass ``entity_json`` (from :func:`entities_to_json`) when building prompts
+    for several chunks of the same document.
+    """
+    if entity_json is None:
+        entity_json = entities_to_json(entities)
     system_prompt = (
         "You are an assistant that maps relationships between known entities. "
         "Only return JSON."
     )
     user_prompt = (
-        "Using the provided original text and the list of entities, output an array "
-        "of relationship objects. Each object must contain `source`, `target`, "
+        "Using the provided original text and the list of entities, output a "
+        "`relationships` array of objects. Each object must contain `source`, `target`, "
         "`relation_type`, and `weight` (float 0-1). "
         "Only include relationships explicitly supported by the text.\n\n"
-        f"Text:\n{text}\n\nEntities:\n{entity_json}\n\nJSON array:"
+        f"Text:\n{text}\n\nEntities:\n{entity_json}"
+    )
+    return system_prompt, user_prompt
+
+
+def extract_entities(text: str, llm: AISuiteLLM) -> List[Entity]:
+    """Infer entities from text via the LLM."""
+    return _coerce_entities(
+        _parse_json_payload(llm, *build_entity_prompts(text), ENTITY_RESPONSE_FORMAT)
+    )
+
+
+def extract_relationships(
+    text: str, entities: Sequence[Entity], llm: AISuiteLLM
+) -> List[Relationship]:
+    """Infer relationships between entities, given the source text."""
+    records = _parse_json_payload(
+        llm, *build_relationship_prompts(text, entities), RELATIONSHIP_RESPONSE_FORMAT
+    )
+    return _coerce_relationships(records, {entity.name for entity in entities})
+
+
+def stream_entities(text: str, llm: AISuiteLLM) -> Iterator[Entity]:
+    """Yield entities while the model is still generating the response."""
+    items = _stream_json_items(llm, *build_entity_prompts(text), ENTITY_RESPONSE_FORMAT)
+    yield from _iter_entities(items)
+
+
+def stream_relationships(
+    text: str, entities: Sequence[Entity], llm: AISuiteLLM
+) -> Iterator[Relationship]:
+    """Yield relationships while the model is still generating the response."""
+    entity_names = {entity.name for entity in entities}
+    items = _stream_json_items(
+        llm, *build_relationship_prompts(text, entities), RELATIONSHIP_RESPONSE_FORMAT
+    )
+    yield from _iter_relationships(items, entity_names)
+
+
+async def aextract_entities(
+    text: str,
+    llm: AsyncAISuiteLLM,
+    *,
+    chunks: Optional[Sequence[str]] = None,
+) -> List[Entity]:
+    """Extract entities from each chunk of the text concurrently, then merge them."""
+    if chunks is None:
+        chunks = chunk_text(text, model=llm.model)
+    responses = await asyncio.gather(
+        *(
+            _aparse_json_payload(llm, *build_entity_prompts(chunk), ENTITY_RESPONSE_FORMAT)
+            for chunk in chunks
+        )
+    )
+    # Overlapping chunks repeat mentions; _coerce_entities keeps the first one.
+    return _coerce_entities(record for records in responses for record in records)
+
+
+async def aextract_relationships(
+    text: str,
+    entities: Sequence[Entity],
+    llm: AsyncAISuiteLLM,
+    *,
+    chunks: Optional[Sequence[str]] = None,
+) -> List[Relationship]:
+    """Extract relationships from the chunks that mention at least one entity."""
+    if chunks is None:
+        chunks = chunk_text(text, model=llm.model)
+    names = {entity.name for entity in entities}
+    relevant = [chunk for chunk in chunks if any(name in chunk for name in names)]
+    entity_json = entities_to_json(entities)
+    responses = await asyncio.gather(
+        *(
+            _aparse_json_payload(
+                llm,
+                *build_relationship_prompts(chunk, entities, entity_json=entity_json),
+                RELATIONSHIP_RESPONSE_FORMAT,
+            )
+            for chunk in relevant or chunks
+        )
+    )
+    return _coerce_relationships(
+        (record for records in responses for record in records),
+        names,
     )
-    raw_relationships = _parse_json_payload(llm, system_prompt, user_prompt)
-    if not isinstance(raw_relationships, list):
-        raise ValueError("Relationship extraction returned a non-list payload.")
-    return _coerce_relationships(raw_relationships, entities)
@@ -1,65 +1,141 @@
-from typing import Iterable
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence
 
 import networkx as nx
-from pyvis.network import Network
+import numpy as np
 
 from codex_code.extraction import Entity, Relationship
+from visualmind.render import VisData, build_vis_data, render_to_html
+
+
+@dataclass(slots=True)
+class EntityTable:
+    """Column-oriented view of an entity list, with importance stored as float32."""
+
+    names: np.ndarray
+    types: np.ndarray
+    importance: np.ndarray
+
+    @classmethod
+    def from_entities(cls, entities: Iterable[Entity]) -> "EntityTable":
+        entities = list(entities)
+        return cls(
+            names=np.array([entity.name for entity in entities], dtype=np.str_),
+            types=np.array([entity.type for entity in entities], dtype=np.str_),
+            importance=np.fromiter(
+                (entity.importance for entity in entities), dtype=np.float32, count=len(entities)
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+@dataclass(slots=True)
+class RelationshipTable:
+    """Column-oriented relationships whose endpoints index into an EntityTable."""
+
+    src_idx: np.ndarray
+    dst_idx: np.ndarray
+    weight: np.ndarray
+    rel_type: np.ndarray
+
+    @classmethod
+    def from_relationships(
+        cls, relationships: Iterable[Relationship], entities: EntityTable
+    ) -> "RelationshipTable":
+        """Resolve endpoints to entity indices, skipping relationships to unknown entities."""
+        index: Dict[str, int] = {}
+        for position, name in enumerate(entities.names.tolist()):
+            index.setdefault(name, position)
+        rows = [
+            (index[relation.source], index[relation.target], relation.weight, relation.relation_type)
+            for relation in relationships
+            if relation.source in index and relation.target in index
+        ]
+        src, dst, weight, rel_type = zip(*rows) if rows else ((), (), (), ())
+        return cls(
+            src_idx=np.array(src, dtype=np.int32),
+            dst_idx=np.array(dst, dtype=np.int32),
+            weight=np.array(weight, dtype=np.float32),
+            rel_type=np.array(rel_type, dtype=np.str_),
+        )
+
+    def __len__(self) -> int:
+        return len(self.src_idx)
+
+
+def _as_floats(values: np.ndarray) -> List[float]:
+    # float32 storage turns 0.7 into 0.699999988...; six decimals stay within its
+    # precision and give callers back the values the model produced.
+    return np.round(values.astype(np.float64), 6).tolist()
 
 
 def build_graph(
     entities: Iterable[Entity], relationships: Iterable[Relationship]
 ) -> nx.DiGraph:
     """Create a directed graph with entity importance and relationship weights."""
+    nodes = EntityTable.from_entities(entities)
+    edges = RelationshipTable.from_relationships(relationships, nodes)
+    names = nodes.names.tolist()
     graph = nx.DiGraph()
-    for entity in entities:
-        graph.add_node(
-            entity.name,
-            **{
-                "type": entity.type,
-                "importance": entity.importance,
-            },
-        )
-    for relation in relationships:
-        if relation.source not in graph.nodes or relation.target not in graph.nodes:
-            # Skip relationships referencing unknown entities.
-            continue
-        graph.add_edge(
-            relation.source,
-            relation.target,
-            relation_type=relation.relation_type,
-            weight=relation.weight,
+    graph.add_nodes_from(
+        (name, {"type": type_, "importance": importance})
+        for name, type_, importance in zip(names, nodes.types.tolist(), _as_floats(nodes.importance))
+    )
+    graph.add_edges_from(
+        (names[src], names[dst], {"relation_type": relation_type, "weight": weight})
+        for src, dst, relation_type, weight in zip(
+            edges.src_idx.tolist(), edges.dst_idx.tolist(), edges.rel_type.tolist(), _as_floats(edges.weight)
         )
+    )
     return graph
 
 
+def to_vis_json(entities: Sequence[Entity], relationships: Iterable[Relationship]) -> VisData:
+    """Build the vis-network payload, scaling node size and edge width."""
+    nodes = EntityTable.from_entities(entities)
+    edges = RelationshipTable.from_relationships(relationships, nodes)
+    names = nodes.names.tolist()
+    widths = _as_floats(1 + edges.weight * 4)
+    return build_vis_data(
+        [
+            {"id": name, "label": name, "title": f"{name} ({type_ or 'entity'})", "value": value}
+            for name, type_, value in zip(
+                names, nodes.types.tolist(), _as_floats(10 + nodes.importance * 30)
+            )
+        ],
+        [
+            {
+                "from": names[src],
+                "to": names[dst],
+                "title": f"{relation_type or 'related'} ({weight:.2f})",
+                "value": width_,
+                "width": width_,
+            }
+            for src, dst, relation_type, weight, width_ in zip(
+                edges.src_idx.tolist(),
+                edges.dst_idx.tolist(),
+                edges.rel_type.tolist(),
+                _as_floats(edges.weight),
+                widths,
+            )
+        ],
+    )
+
+
 def render_graph(
-    graph: nx.DiGraph,
+    entities: Sequence[Entity],
+    relationships: Iterable[Relationship],
     output_path: str,
     *,
-    notebook: bool = False,
     height: str = "600px",
     width: str = "100%",
 ) -> None:
-    """Render a graph to PyVis HTML, scaling node size and edge width."""
-    visual = Network(height=height, width=width, directed=True, notebook=notebook)
-    for node, data in graph.nodes(data=True):
-        importance = float(data.get("importance", 0.5))
-        size = 10 + importance * 30
-        visual.add_node(
-            node,
-            label=node,
-            title=f"{node} ({data.get('type', 'entity')})",
-            value=size,
-        )
-    for source, target, data in graph.edges(data=True):
-        weight = float(data.get("weight", 0.5))
-        width_ = 1 + weight * 4
-        title = f"{data.get('relation_type', 'related')} ({weight:.2f})"
-        visual.add_edge(
-            source,
-            target,
-            title=title,
-            value=width_,
-            width=width_,
-        )
-    visual.write_html(output_path, open_browser=False)
+    """Render entities and relationships to vis-network HTML, scaling node size and edge width."""
+    render_to_html(
+        to_vis_json(entities, relationships),
+        output_path,
+        height=height,
+        width=width,
+    )
@@ -1,11 +1,27 @@
 import argparse
+import asyncio
 import sys
 from pathlib import Path
+from typing import List, Optional, Tuple
 
 from dotenv import load_dotenv
 
-from codex_code.extraction import AISuiteLLM, extract_entities, extract_relationships
-from codex_code.graph_utils import build_graph, render_graph
+from codex_code.batch import batch_extract
+from codex_code.extraction import (
+    AsyncAISuiteLLM,
+    Entity,
+    Relationship,
+    aextract_entities,
+    aextract_relationships,
+    chunk_text,
+    stream_entities,
+    stream_relationships,
+)
+from codex_code.graph_utils import render_graph, to_vis_json
+from visualmind.http_clients import build_http_client
+from visualmind.inputs import collect_inputs, output_path_for, read_document
+from visualmind.llm_cache import SemanticCache, SQLiteCache
+from visualmind.render import write_vis_json
 
 
 def parse_args() -> argparse.Namespace:
@@ -14,15 +30,20 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--input",
-        type=Path,
-        default=Path("sample_input.txt"),
-        help="Path to the input text file.",
+        type=str,
+        default="sample_input.txt",
+        help="Input text file, directory of .txt files, or glob pattern.",
     )
     parser.add_argument(
         "--output",
         type=Path,
-        default=Path("output_graph.html"),
-        help="Output path for the HTML visualization.",
+        default=None,
+        help="Output path for the graph (default: output_graph.json, or output_graph.html with --html).",
+    )
+    parser.add_argument(
+        "--html",
+        action="store_true",
+        help="Write a standalone vis-network HTML page instead of the vis-network JSON payload.",
     )
     parser.add_argument(
         "--model",
@@ -30,34 +51,170 @@ def parse_args() -> argparse.Namespace:
         default="openai:gpt-4o",
         help="aisuite model identifier (e.g., openai:gpt-4o).",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of documents processed concurrently.",
+    )
+    parser.add_argument(
+        "--chunk-tokens",
+        type=int,
+        default=2000,
+        help="Maximum tokens per text chunk sent to the LLM.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream each response and parse records as they arrive (one prompt per stage, no chunking).",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=Path("llm_cache.sqlite3"),
+        help="SQLite file used to cache LLM responses between runs.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the LLM, ignoring and not updating the cache.",
+    )
+    parser.add_argument(
+        "--semantic-cache",
+        action="store_true",
+        help="On an exact cache miss, reuse a response whose prompt embedding is nearly identical.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit each extraction stage for all inputs as one OpenAI Batch API job.",
+    )
     return parser.parse_args()
 
 
-def main() -> None:
-    args = parse_args()
-    load_dotenv()
+def save_graph(
+    entities: List[Entity], relationships: List[Relationship], output: Path, html: bool
+) -> None:
+    if html:
+        render_graph(entities, relationships, str(output))
+    else:
+        write_vis_json(to_vis_json(entities, relationships), output)
+    print(f"Graph saved to {output}")
+
+
+def extract_streaming(text: str, llm: AsyncAISuiteLLM) -> Tuple[List[Entity], List[Relationship]]:
+    entities = []
+    for entity in stream_entities(text, llm):
+        print(f"    entity: {entity.name}")
+        entities.append(entity)
+    return entities, list(stream_relationships(text, entities, llm))
 
-    if not args.input.exists():
-        print(f"Input file not found: {args.input}", file=sys.stderr)
-        sys.exit(1)
 
-    text = args.input.read_text(encoding="utf-8").strip()
+async def process_doc(
+    path: Path,
+    output: Path,
+    llm: AsyncAISuiteLLM,
+    chunk_tokens: int,
+    stream: bool = False,
+    html: bool = False,
+) -> None:
+    text = read_document(path)
     if not text:
-        print("Input text is empty.", file=sys.stderr)
-        sys.exit(1)
+        raise ValueError("Input text is empty.")
+    if stream:
+        print(f"[1-2] Streaming extraction for {path}...")
+        entities, relationships = await asyncio.to_thread(extract_streaming, text, llm)
+        print(f"[3] Rendering graph for {path}...")
+        save_graph(entities, relationships, output, html)
+        return
+
+    chunks = chunk_text(text, chunk_tokens, min(200, chunk_tokens // 10), model=llm.model)
+
+    print(f"[1] Extracting entities from {path} ({len(chunks)} chunks)...")
+    entities = await aextract_entities(text, llm, chunks=chunks)
+
+    print(f"[2] Extracting relationships from {path}...")
+    relationships = await aextract_relationships(text, entities, llm, chunks=chunks)
+
+    print(f"[3] Rendering graph for {path}...")
+    save_graph(entities, relationships, output, html)
+
+
+def run_batch(args: argparse.Namespace, inputs: List[Path]) -> int:
+    texts = {}
+    for path in inputs:
+        text = read_document(path)
+        if text:
+            texts[str(path)] = text
+        else:
+            print(f"{path}: Input text is empty.", file=sys.stderr)
+
+    print(f"[1-2] Submitting batch extraction for {len(texts)} documents...")
+    results = batch_extract(texts, model=args.model)
+
+    print("[3] Rendering graphs...")
+    multiple = len(inputs) > 1
+    for path in inputs:
+        if str(path) not in results:
+            continue
+        entities, relationships = results[str(path)]
+        save_graph(entities, relationships, output_path_for(args.output, path, multiple), args.html)
+    return 0 if len(results) == len(inputs) else 1
 
-    llm = AISuiteLLM(model=args.model)
 
-    print("[1] Extracting entities...")
-    entities = extract_entities(text, llm)
+def build_cache(args: argparse.Namespace) -> Optional[SQLiteCache]:
+    if args.no_cache:
+        return None
+    if args.semantic_cache:
+        return SemanticCache(args.cache)
+    return SQLiteCache(args.cache)
 
-    print("[2] Extracting relationships...")
-    relationships = extract_relationships(text, entities, llm)
 
-    print("[3] Building and rendering graph...")
-    graph = build_graph(entities, relationships)
-    render_graph(graph, str(args.output))
-    print(f"Graph saved to {args.output}")
+async def run(args: argparse.Namespace, inputs: List[Path]) -> int:
+    # aisuite is synchronous, so its requests share a blocking pool across the
+    # worker threads that run them concurrently.
+    http_client = build_http_client()
+    llm = AsyncAISuiteLLM(model=args.model, cache=build_cache(args), http_client=http_client)
+    semaphore = asyncio.Semaphore(max(1, args.concurrency))
+    multiple = len(inputs) > 1
+
+    async def _bounded(path: Path) -> None:
+        async with semaphore:
+            await process_doc(
+                path,
+                output_path_for(args.output, path, multiple),
+                llm,
+                args.chunk_tokens,
+                args.stream,
+                args.html,
+            )
+
+    try:
+        results = await asyncio.gather(*(_bounded(path) for path in inputs), return_exceptions=True)
+    finally:
+        http_client.close()
+    failures = 0
+    for path, result in zip(inputs, results):
+        if isinstance(result, Exception):
+            failures += 1
+            print(f"{path}: {result}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def main() -> None:
+    args = parse_args()
+    load_dotenv()
+    if args.output is None:
+        args.output = Path("output_graph.html" if args.html else "output_graph.json")
+
+    inputs = collect_inputs(args.input)
+    if not inputs:
+        print(f"Input file not found: {args.input}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.batch:
+        sys.exit(run_batch(args, inputs))
+    sys.exit(asyncio.run(run(args, inputs)))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+"""API clients shared by the scripts so every call reuses one warm HTTP/2 pool."""
+
+import aisuite as ai
+from dotenv import load_dotenv
+from openai import OpenAI
+
+from visualmind.http_clients import build_http_client
+
+# The clients read OPENAI_API_KEY when they are built, before the scripts' own load_dotenv().
+load_dotenv()
+
+HTTP_CLIENT = build_http_client()
+# call_with_retry owns retries; the SDK's own two would multiply its six attempts.
+AI_CLIENT = ai.Client(provider_configs={"openai": {"http_client": HTTP_CLIENT, "max_retries": 0}})
+OAI_CLIENT = OpenAI(http_client=HTTP_CLIENT, max_retries=0)
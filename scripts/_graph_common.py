@@ -0,0 +1,195 @@
+"""Prompts, schema, merge helpers, and rendering shared by graph.py and batch_mode.py."""
+
+import numpy as np
+from rapidfuzz import fuzz, process, utils
+
+from visualmind.render import VisData, build_vis_data
+
+MODEL = "openai:gpt-5-mini-2025-08-07"
+
+_ENTITY_TYPES = ["person", "organization", "state"]
+# Keys every parsed record must carry before the graph code reads it.
+ENTITY_KEYS = ("name", "type", "importance")
+CANONICAL_ENTITY_KEYS = ("canonical_name", "importance")
+RELATIONSHIP_KEYS = ("source", "target", "relationship", "weight")
+# The staged synonym merge is skipped unless some pair of step 1 names is at least this similar.
+SYNONYM_GATE_SCORE = 70
+GRAPH_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "graph",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "entities": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "canonical_name": {"type": "string"},
+                            "types": {"type": "array", "items": {"type": "string", "enum": _ENTITY_TYPES}},
+                            "importance": {"type": "number"},
+                            "members": {"type": "array", "items": {"type": "string"}},
+                        },
+                        "required": ["canonical_name", "types", "importance", "members"],
+                        "additionalProperties": False,
+                    },
+                },
+                "relationships": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "source": {"type": "string"},
+                            "target": {"type": "string"},
+                            "relationship": {"type": "string"},
+                            "weight": {"type": "number"},
+                        },
+                        "required": ["source", "target", "relationship", "weight"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["entities", "relationships"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+FUSED_SYSTEM_PROMPT = (
+    """
+    You are an information extraction assistant that builds entity relationship graphs.
+    Return ONLY valid JSON matching the schema. No prose.
+    """
+)
+
+
+def fused_user_prompt(text: str) -> str:
+    """User prompt asking for canonical entities and their relationships in one reply."""
+    return (
+        f"""
+        Extract the main entities of the text, merge synonyms, and map the relationships between them.
+
+        Entities ("entities"):
+          - Include only people, organizations, and states; "state" = sovereign country or subnational state/province; government bodies/agencies are "organization". Exclude events, products, generic locations.
+          - Merge entities that refer to the same thing in the context of the text (e.g., "Xi Jinping" and "China") into one object.
+          - "canonical_name": the primary name; "types": the merged entities' types (lowercase, unique); "importance": float in [0,1], the max of the merged entities; "members": every name merged into it, including the canonical one.
+
+        Relationships ("relationships"):
+          - "source" and "target" MUST be exact "canonical_name" values. Skip any relation that cannot be mapped to them.
+          - "relationship" is a short, lowercase label describing the link (e.g., "owner", "director", "founder", "advisor", "loaned money", "negotiated sale", "worked together", "acquired").
+          - "weight" is a float in [0,1] reflecting how important this connection is relative to the document's overall context. Use higher weights for explicit, central ties; lower for weak or incidental mentions.
+          - Direction: set "source" as the actor/subject and "target" as the object/recipient (e.g., "A acquired B" -> source="A", target="B").
+          - No duplicates by (source, target, relationship); only relationships explicitly supported by the text.
+
+        Text:
+        {text}
+        """
+    )
+
+
+def _name_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def union_entities(entity_lists):
+    """Merge step 1 entity lists from every chunk, keeping the highest importance per name."""
+    merged = {}
+    for entities in entity_lists:
+        for entity in entities:
+            key = _name_key(entity["name"])
+            if key not in merged:
+                merged[key] = dict(entity)
+            elif entity["importance"] > merged[key]["importance"]:
+                merged[key]["importance"] = entity["importance"]
+    return list(merged.values())
+
+
+def needs_synonym_merge(entities) -> bool:
+    """Whether any two entity names look alike enough to be worth an LLM synonym merge."""
+    names = [entity["name"] for entity in entities]
+    if len(names) < 2:
+        return False
+    scores = process.cdist(
+        names,
+        names,
+        scorer=fuzz.token_set_ratio,
+        processor=utils.default_process,
+        score_cutoff=SYNONYM_GATE_SCORE,
+        workers=-1,
+    )
+    # Ignore each name's score against itself; any remaining cell is a candidate pair.
+    np.fill_diagonal(scores, 0)
+    return bool(scores.any())
+
+
+def union_canonical(entity_lists):
+    """Merge canonical entities extracted from different chunks that share a name."""
+    merged = {}
+    for entities in entity_lists:
+        for entity in entities:
+            key = _name_key(entity["canonical_name"])
+            if key not in merged:
+                merged[key] = {**entity, "types": list(entity.get("types", [])), "members": list(entity.get("members", []))}
+                continue
+            target = merged[key]
+            target["importance"] = max(target["importance"], entity["importance"])
+            target["types"] += [type_ for type_ in entity.get("types", []) if type_ not in target["types"]]
+            target["members"] += [name for name in entity.get("members", []) if name not in target["members"]]
+    return list(merged.values())
+
+
+def remap_relationships(entities, relationships):
+    """Move relationship endpoints onto canonical names, dropping unresolved edges and self-loops."""
+    canonical_names = {}
+    for entity in entities:
+        for name in [entity["canonical_name"], *entity.get("members", [])]:
+            canonical_names.setdefault(name, entity["canonical_name"])
+            canonical_names.setdefault(_name_key(name), entity["canonical_name"])
+    remapped = []
+    for relation in relationships:
+        source = canonical_names.get(relation["source"]) or canonical_names.get(_name_key(relation["source"]))
+        target = canonical_names.get(relation["target"]) or canonical_names.get(_name_key(relation["target"]))
+        if source is None or target is None or source == target:
+            continue
+        remapped.append({**relation, "source": source, "target": target})
+    return remapped
+
+
+def dedupe_relationships(relationships):
+    """Keep one relationship per (source, target, relationship), the one with the highest weight."""
+    # The prompts ask the model for this too, but it does not reliably comply.
+    best = {}
+    for relation in relationships:
+        key = (relation["source"], relation["target"], relation["relationship"])
+        if key not in best or relation["weight"] > best[key]["weight"]:
+            best[key] = relation
+    return list(best.values())
+
+
+def graph_data(entities, relationships) -> VisData:
+    """Turn fused/merged entities and relationships into the vis-network payload."""
+    # Relationships referencing unknown entities are skipped.
+    return build_vis_data(
+        [
+            {
+                "id": entity["canonical_name"],
+                "label": entity["canonical_name"],
+                "value": entity["importance"],
+                # vis-network colours nodes per group; merged entities use their first type.
+                "group": (entity.get("types") or ["entity"])[0],
+            }
+            for entity in entities
+        ],
+        (
+            {
+                "from": relation["source"],
+                "to": relation["target"],
+                "width": relation["weight"],
+                "title": relation["relationship"],
+            }
+            for relation in dedupe_relationships(relationships)
+        ),
+    )
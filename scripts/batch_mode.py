@@ -0,0 +1,87 @@
+import argparse
+import hashlib
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from visualmind.batch import submit_batch
+from visualmind.inputs import collect_inputs, read_document
+from visualmind.json_utils import complete_records
+from visualmind.render import render_to_html
+
+from scripts._graph_common import (
+    CANONICAL_ENTITY_KEYS,
+    FUSED_SYSTEM_PROMPT,
+    GRAPH_RESPONSE_FORMAT,
+    MODEL,
+    RELATIONSHIP_KEYS,
+    fused_user_prompt,
+    graph_data,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build a graph for every text in a folder with one OpenAI Batch API job."
+    )
+    parser.add_argument(
+        "--input",
+        type=str,
+        default="data",
+        help="Directory of .txt files, single text file, or glob pattern.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path("data/graphs"),
+        help="Directory the <name>_graph.html pages are written to.",
+    )
+    parser.add_argument("--model", type=str, default=MODEL, help="aisuite model identifier.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    load_dotenv()
+
+    inputs = collect_inputs(args.input)
+    if not inputs:
+        print(f"Input file not found: {args.input}", file=sys.stderr)
+        sys.exit(1)
+
+    # Identical texts share one batch row; the fused prompt makes that row the whole pipeline.
+    doc_ids = {}
+    prompts = {}
+    for path in inputs:
+        text = read_document(path)
+        if not text:
+            print(f"{path}: Input text is empty.", file=sys.stderr)
+            continue
+        doc_id = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        doc_ids[path] = doc_id
+        prompts.setdefault(doc_id, (FUSED_SYSTEM_PROMPT, fused_user_prompt(text)))
+
+    print(f"[1-2] Submitting {len(prompts)} unique texts ({len(doc_ids)} files) as one batch...")
+    results = submit_batch(prompts, model=args.model, response_format=GRAPH_RESPONSE_FORMAT)
+
+    print("[3] Rendering graphs...")
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    failures = len(inputs) - len(doc_ids)
+    for path, doc_id in doc_ids.items():
+        payload = results.get(doc_id)
+        if not isinstance(payload, dict):
+            failures += 1
+            continue
+        render_to_html(
+            graph_data(
+                complete_records(payload.get("entities"), CANONICAL_ENTITY_KEYS),
+                complete_records(payload.get("relationships"), RELATIONSHIP_KEYS),
+            ),
+            args.output_dir / f"{path.stem}_graph.html",
+        )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
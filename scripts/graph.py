@@ -1,156 +1,254 @@
-from dotenv import load_dotenv
-import aisuite as ai
-import json
-import networkx as nx
-from pyvis.network import Network
-
-load_dotenv()
-
-with open("data/sample_input_ch.txt", "r") as f:
-    text = f.read().strip()
+import asyncio
+from pathlib import Path
 
-client = ai.Client()
-
-# STEP 1: Extract entities
-system_prompt = (
-    """
-    You are an information extraction assistant. Extract entities from text.
-    Return ONLY valid JSON. No prose.
-    """
-)
-user_prompt = (
-    f"""
-    Extract the main entities from the text and return ONLY a JSON array.
-    Each entity object must have:
-      - "name": string
-      - "type": one of ["person","organization","state"] (lowercase only)
-      - "importance": float in [0,1]
-
-    Rules:
-      - Include only these three types; exclude everything else (events, products, generic locations).
-      - "state" = sovereign country or subnational state/province; government bodies/agencies are "organization".
-      - No duplicates (deduplicate by canonical name).
-      - If none found, return [].
-
-    Text:
-    {text}
-
-    JSON array:
-    """
-)
-messages = [
-    {"role": "system", "content": system_prompt},
-    {"role": "user", "content": user_prompt},
-]
-
-response = client.chat.completions.create(model="openai:gpt-5-mini-2025-08-07", messages=messages)
-
-print(response.choices[0].message.content)
-
-entities_str = response.choices[0].message.content
-entities = json.loads(entities_str)
-
-###########################
-
-system_prompt = (
-    """
-    You are an information assistant. Determine the synonyms in the given list.
-    Return ONLY valid JSON. No prose.
-    """
+from dotenv import load_dotenv
+import ijson
+import orjson
+
+from visualmind.chunking import chunk_text
+from visualmind.inputs import read_document
+from visualmind.json_utils import complete_records, parse_json_lenient
+from visualmind.llm_cache import SQLiteCache, cached_complete, cached_stream
+from visualmind.render import render_to_html
+from visualmind.streaming import iter_json_items
+
+from scripts._clients import AI_CLIENT
+from scripts._graph_common import (
+    CANONICAL_ENTITY_KEYS,
+    ENTITY_KEYS,
+    FUSED_SYSTEM_PROMPT,
+    GRAPH_RESPONSE_FORMAT,
+    MODEL,
+    RELATIONSHIP_KEYS,
+    fused_user_prompt,
+    graph_data,
+    needs_synonym_merge,
+    remap_relationships,
+    union_canonical,
+    union_entities,
 )
-user_prompt = (
-    f"""
-    From json array of entities, determine the entities that are synonyms of each other given the context.
-    For examly, "Xi Jinping" and "China" refers to the same thing in the context of the text.
-    Merge such entities into one entity object with the JSON structure
 
-    Text:
-    {text}
-
-    Input JSON array:
-    {entities_str}
-
-    JSON array:
-    """
-)
-messages = [
-    {"role": "system", "content": system_prompt},
-    {"role": "user", "content": user_prompt},
-]
+load_dotenv()
 
-response = client.chat.completions.create(model="openai:gpt-5-mini-2025-08-07", messages=messages)
+text = read_document(Path("data/sample_input_ch.txt"))
+
+client = AI_CLIENT
+cache = SQLiteCache("data/llm_cache.sqlite3")
+# One structured call (entities, synonym merge, and relationships together) sends
+# the text once; set to False for the three-step prompt chain.
+FUSED = True
+# Per-step models for the staged chain. Synonym merging is a small coreference
+# task, so short entity lists go to the cheaper model.
+MODELS = {"extract": MODEL, "merge": "openai:gpt-4o-mini", "relate": MODEL}
+MERGE_CASCADE_LIMIT = 20
+# Long inputs are split into overlapping windows so no single prompt carries the
+# whole text; each window is extracted concurrently and the results merged here.
+CHUNK_TOKENS = 4000
+CHUNK_OVERLAP = 200
+chunks = chunk_text(text, CHUNK_TOKENS, CHUNK_OVERLAP, model=MODEL)
+
+
+async def complete(system_prompt: str, user_prompt: str, model: str = MODEL, **kwargs) -> str:
+    """Run one chat completion on a worker thread and return its text."""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+    content = await asyncio.to_thread(cached_complete, client, model, messages, cache=cache, **kwargs)
+    print(content)
+    return content
+
+
+GRAPH_ITEM_PREFIXES = {"entities.item": "entities", "relationships.item": "relationships"}
+
+
+def stream_graph(system_prompt: str, user_prompt: str):
+    """Stream the fused response, collecting entities and relationships as each one closes."""
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+    received = []
+
+    def recording():
+        for chunk in cached_stream(client, MODEL, messages, cache=cache, response_format=GRAPH_RESPONSE_FORMAT):
+            received.append(chunk)
+            yield chunk
+
+    chunks = recording()
+    graph = {"entities": [], "relationships": []}
+    try:
+        for key, item in iter_json_items(chunks, GRAPH_ITEM_PREFIXES):
+            print(f"{key}: {orjson.dumps(item).decode()}")
+            graph[key].append(item)
+    except ijson.JSONError:
+        # Fall back to parsing the whole response once it has arrived.
+        for _ in chunks:
+            pass
+        graph = parse_json_lenient("".join(received))
+        if not isinstance(graph, dict):
+            graph = {}
+    return (
+        complete_records(graph.get("entities"), CANONICAL_ENTITY_KEYS),
+        complete_records(graph.get("relationships"), RELATIONSHIP_KEYS),
+    )
 
-print(response.choices[0].message.content)
 
-entities_str = response.choices[0].message.content
-entities = json.loads(entities_str)
+async def extract_fused():
+    # STEPS 1-2: Extract canonical entities and their relationships in one call per chunk
+    graphs = await asyncio.gather(
+        *(asyncio.to_thread(stream_graph, FUSED_SYSTEM_PROMPT, fused_user_prompt(chunk)) for chunk in chunks)
+    )
+    if len(graphs) == 1:
+        return graphs[0]
+    # Chunks name the same entity independently; union them and point every
+    # edge at the merged canonical names (graph_data drops the duplicate edges).
+    entities = union_canonical(chunk_entities for chunk_entities, _ in graphs)
+    return entities, remap_relationships(entities, [relation for _, relations in graphs for relation in relations])
+
+
+async def extract_staged():
+    # STEP 1: Extract entities from every chunk concurrently
+    system_prompt = (
+        """
+        You are an information extraction assistant. Extract entities from text.
+        Return ONLY valid JSON. No prose.
+        """
+    )
 
-# STEP 2: Extract relationships
-system_prompt = (
-    """
-    You are an assistant that maps relationships between known entities.
-    Return ONLY valid JSON. No prose.
-    """
-)
-user_prompt = (
-    f"""
-    Using the original text and the extracted entities, return ONLY a JSON array of relationship objects.
-    Each relationship object must have:
-      - "source": string (exactly matching an entity "name")
-      - "target": string (exactly matching an entity "name")
-      - "relationship": string
-      - "weight": float in [0,1]
-
-    Requirements:
-      - Each object must have exactly these keys: "source", "target", "relationship", "weight".
-      - "source" and "target" MUST be exact string matches of entity "name" values from the Entities list below. Do not invent, alias, or rename entities. Skip any relation that cannot be mapped to the given names.
-      - "relationship" is a short, lowercase label describing the link (e.g., "owner", "director", "founder", "advisor", "loaned money", "negotiated sale", "worked together", "acquired").
-      - "weight" is a float in [0,1] reflecting how important this connection is relative to the document's overall context. Consider the explicitness of the statement, centrality to the narrative, strength/frequency of evidence, and the entities' "importance" scores. Use higher weights for explicit, central ties; lower for weak or incidental mentions.
-      - Direction: If the text implies direction, set "source" as the actor/subject and "target" as the object/recipient (e.g., "A acquired B" -> source="A", target="B"). If direction is unclear, prefer the conventional direction for the verb; otherwise omit the relation.
-      - No duplicates. If the same (source, target, relationship) appears multiple times, include one object with the highest appropriate weight.
-      - Only include relationships explicitly supported by the text. If none, return [].
-      - Output MUST be valid JSON and nothing else.
-
-    Text:
-    {text}
-
-    Entities (use names exactly as provided):
-    {entities_str}
-
-    JSON array:
-    """
-)
-messages = [
-    {"role": "system", "content": system_prompt},
-    {"role": "user", "content": user_prompt},
-]
+    def user_prompt(chunk: str) -> str:
+        return f"""
+        Extract the main entities from the text and return ONLY a JSON array.
+        Each entity object must have:
+          - "name": string
+          - "type": one of ["person","organization","state"] (lowercase only)
+          - "importance": float in [0,1]
 
-response = client.chat.completions.create(model="openai:gpt-5-mini-2025-08-07", messages=messages)
+        Rules:
+          - Include only these three types; exclude everything else (events, products, generic locations).
+          - "state" = sovereign country or subnational state/province; government bodies/agencies are "organization".
+          - No duplicates (deduplicate by canonical name).
+          - If none found, return [].
 
-print(response.choices[0].message.content)
+        Text:
+        {chunk}
 
-relationships_str = response.choices[0].message.content
-relationships = json.loads(relationships_str)
+        JSON array:
+        """
 
-# STEP 3: Build and render graph
-graph = nx.DiGraph()
-for entity in entities:
-    graph.add_node(
-        entity["canonical_name"],
-        type=entity["types"],
-        value=entity["importance"],
+    chunk_entities = await asyncio.gather(
+        *(complete(system_prompt, user_prompt(chunk), model=MODELS["extract"]) for chunk in chunks)
+    )
+    # Overlapping chunks repeat names; merge them on the normalised name first.
+    step1_entities = union_entities(
+        complete_records(parse_json_lenient(entities_str), ENTITY_KEYS) for entities_str in chunk_entities
+    )
+    entities_str = orjson.dumps(step1_entities).decode()
+    merge_model = MODELS["merge"] if len(step1_entities) < MERGE_CASCADE_LIMIT else MODELS["extract"]
+    # The merge runs once over the union; only a single-chunk text is small enough to send along.
+    merge_context = text if len(chunks) == 1 else "(omitted: the text is long; use the names and types)"
+
+    # STEP 2: Merge synonyms once and extract relationships per chunk concurrently;
+    # both only need the text and the step 1 entities.
+    synonym_system_prompt = (
+        """
+        You are an information assistant. Determine the synonyms in the given list.
+        Return ONLY valid JSON. No prose.
+        """
+    )
+    synonym_user_prompt = (
+        f"""
+        From json array of entities, determine the entities that are synonyms of each other given the context.
+        For examly, "Xi Jinping" and "China" refers to the same thing in the context of the text.
+        Merge such entities into one entity object with the JSON structure:
+          - "canonical_name": string
+          - "types": array of the merged entities' types
+          - "importance": float in [0,1], the max of the merged entities
+          - "members": array of every input "name" merged into this entity (including the canonical one)
+        Every input entity must appear in exactly one "members" array.
+
+        Text:
+        {merge_context}
+
+        Input JSON array:
+        {entities_str}
+
+        JSON array:
+        """
     )
-for relation in relationships:
-    if relation["source"] not in graph.nodes or relation["target"] not in graph.nodes:
-        # Skip relationships referencing unknown entities.
-        continue
-    graph.add_edge(
-        relation["source"],
-        relation["target"],
-        width=relation["weight"],
-        title=relation["relationship"]
+    relationship_system_prompt = (
+        """
+        You are an assistant that maps relationships between known entities.
+        Return ONLY valid JSON. No prose.
+        """
     )
 
-nt = Network(directed=True)
-nt.from_nx(graph)
-nt.write_html('data/output_graph.html')
+    def relationship_user_prompt(chunk: str) -> str:
+        return f"""
+        Using the original text and the extracted entities, return ONLY a JSON array of relationship objects.
+        Each relationship object must have:
+          - "source": string (exactly matching an entity "name")
+          - "target": string (exactly matching an entity "name")
+          - "relationship": string
+          - "weight": float in [0,1]
+
+        Requirements:
+          - Each object must have exactly these keys: "source", "target", "relationship", "weight".
+          - "source" and "target" MUST be exact string matches of entity "name" values from the Entities list below. Do not invent, alias, or rename entities. Skip any relation that cannot be mapped to the given names.
+          - "relationship" is a short, lowercase label describing the link (e.g., "owner", "director", "founder", "advisor", "loaned money", "negotiated sale", "worked together", "acquired").
+          - "weight" is a float in [0,1] reflecting how important this connection is relative to the document's overall context. Consider the explicitness of the statement, centrality to the narrative, strength/frequency of evidence, and the entities' "importance" scores. Use higher weights for explicit, central ties; lower for weak or incidental mentions.
+          - Direction: If the text implies direction, set "source" as the actor/subject and "target" as the object/recipient (e.g., "A acquired B" -> source="A", target="B"). If direction is unclear, prefer the conventional direction for the verb; otherwise omit the relation.
+          - No duplicates. If the same (source, target, relationship) appears multiple times, include one object with the highest appropriate weight.
+          - Only include relationships explicitly supported by the text. If none, return [].
+          - Output MUST be valid JSON and nothing else.
+
+        Text:
+        {chunk}
+
+        Entities (use names exactly as provided):
+        {entities_str}
+
+        JSON array:
+        """
+
+    relationship_calls = [
+        complete(relationship_system_prompt, relationship_user_prompt(chunk), model=MODELS["relate"])
+        for chunk in chunks
+    ]
+    if needs_synonym_merge(step1_entities):
+        entities_str, *relationship_strs = await asyncio.gather(
+            complete(synonym_system_prompt, synonym_user_prompt, model=merge_model),
+            *relationship_calls,
+        )
+        entities = complete_records(parse_json_lenient(entities_str), CANONICAL_ENTITY_KEYS)
+    else:
+        # No similar names: every step 1 entity is its own canonical entity.
+        relationship_strs = await asyncio.gather(*relationship_calls)
+        entities = [
+            {
+                "canonical_name": entity["name"],
+                "types": [entity["type"]],
+                "importance": entity["importance"],
+                "members": [entity["name"]],
+            }
+            for entity in step1_entities
+        ]
+    relationships = [
+        relation
+        for relationships_str in relationship_strs
+        for relation in complete_records(parse_json_lenient(relationships_str), RELATIONSHIP_KEYS)
+    ]
+
+    # Relationships were extracted against the step 1 names; move their endpoints
+    # onto the merged entities (graph_data drops the duplicates across chunks).
+    return entities, remap_relationships(entities, relationships)
+
+
+async def main() -> None:
+    entities, relationships = await (extract_fused() if FUSED else extract_staged())
+
+    # STEP 3: Render graph
+    render_to_html(graph_data(entities, relationships), "data/output_graph.html")
+
+
+asyncio.run(main())
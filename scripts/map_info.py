@@ -1,17 +1,22 @@
 from dotenv import load_dotenv
-import aisuite as ai
-import json
 import networkx as nx
 from pyvis.network import Network
-from openai import OpenAI
 import base64
+from pathlib import Path
+
+from visualmind.inputs import read_document
+from visualmind.json_utils import parse_json_lenient
+from visualmind.llm_cache import SQLiteCache, cached_complete
+from visualmind.retry import IMAGE_TIMEOUT, call_with_retry
+
+from scripts._clients import AI_CLIENT, OAI_CLIENT
 
 load_dotenv()
 
-with open("data/map_input.txt", "r") as f:
-    text = f.read().strip()
+text = read_document(Path("data/map_input.txt"))
 
-client = ai.Client()
+client = AI_CLIENT
+cache = SQLiteCache("data/llm_cache.sqlite3")
 
 system_prompt = (
     """
@@ -44,12 +49,11 @@ messages = [
     {"role": "user", "content": user_prompt},
 ]
 
-response = client.chat.completions.create(model="openai:gpt-5-mini-2025-08-07", messages=messages)
+locations_str = cached_complete(client, "openai:gpt-5-mini-2025-08-07", messages, cache=cache)
 
-print(response.choices[0].message.content)
+print(locations_str)
 
-locations_str = response.choices[0].message.content
-locations = json.loads(locations_str)
+locations = parse_json_lenient(locations_str)
 
 
 system_prompt = (
@@ -76,15 +80,17 @@ messages = [
 ]
 
 # Call OpenAI's Image API directly (no AI Suite) to generate a map image
-openai_client = OpenAI()
+openai_client = OAI_CLIENT
 
 # Flatten the chat-style prompt into a single prompt string for image generation
 _prompt_text = system_prompt + "\n" + user_prompt
 
-image_response = openai_client.images.generate(
+image_response = call_with_retry(
+    openai_client.images.generate,
     model="gpt-image-1",
     prompt=_prompt_text,
     size="1024x1024",
+    timeout=IMAGE_TIMEOUT,
 )
 
 # Save the first returned image to disk (with basic safety checks)
@@ -0,0 +1,31 @@
+import json
+
+from visualmind.batch import _batch_jsonl
+
+
+def test_batch_jsonl_writes_one_request_per_prompt():
+    payload = _batch_jsonl(
+        {"doc-1": ("Be brief.", "Hi"), "doc-2": ("Be brief.", "数据")},
+        "gpt-4o",
+        {"type": "json_object"},
+    )
+    lines = payload.decode("utf-8").splitlines()
+    assert payload.endswith(b"\n")
+    assert [json.loads(line)["custom_id"] for line in lines] == ["doc-1", "doc-2"]
+    request = json.loads(lines[1])
+    assert request["method"] == "POST"
+    assert request["url"] == "/v1/chat/completions"
+    assert request["body"] == {
+        "model": "gpt-4o",
+        "messages": [
+            {"role": "system", "content": "Be brief."},
+            {"role": "user", "content": "数据"},
+        ],
+        "response_format": {"type": "json_object"},
+    }
+    assert "数据" in lines[1]
+
+
+def test_batch_jsonl_omits_missing_response_format():
+    (line,) = _batch_jsonl({"doc": ("s", "u")}, "gpt-4o", None).decode().splitlines()
+    assert "response_format" not in json.loads(line)["body"]
@@ -0,0 +1,50 @@
+import pytest
+import tiktoken
+
+from visualmind import chunking
+from visualmind.chunking import chunk_text
+
+# One token per byte keeps the windows predictable without downloading a BPE file.
+BYTE_ENCODING = tiktoken.Encoding(
+    name="bytes",
+    pat_str=r"\S+|\s+",
+    mergeable_ranks={bytes([value]): value for value in range(256)},
+    special_tokens={},
+)
+TEXT = " ".join(f"word{index}" for index in range(40))
+
+
+@pytest.fixture(autouse=True)
+def byte_encoding(monkeypatch):
+    monkeypatch.setattr(chunking, "_encoding_for", lambda model: BYTE_ENCODING)
+
+
+def test_chunk_text_keeps_short_text_whole():
+    assert chunk_text("Ada founded ACME.", 50, 10) == ["Ada founded ACME."]
+
+
+def test_chunk_text_windows_overlap_and_cover_the_text():
+    chunks = chunk_text(TEXT, 50, 10)
+    assert len(chunks) > 1
+    assert all(len(chunk.encode("utf-8")) <= 50 for chunk in chunks)
+    assert chunks[0] == TEXT[:50]
+    assert chunks[-1].endswith("word39")
+    for previous, current in zip(chunks, chunks[1:]):
+        assert previous[-10:] == current[:10]
+
+
+@pytest.mark.parametrize("overlap", [-1, 50])
+def test_chunk_text_rejects_bad_overlap(overlap):
+    with pytest.raises(ValueError, match="overlap"):
+        chunk_text(TEXT, 50, overlap)
+
+
+
+def test_chunk_text_never_splits_multibyte_characters():
+    # Every character is three bytes, so most byte-token windows end mid-character.
+    text = "".join(chr(0x4E00 + index) for index in range(40))
+    chunks = chunk_text(text, 10, 2)
+    assert all("\ufffd" not in chunk and chunk in text for chunk in chunks)
+    spans = [(text.index(chunk), text.index(chunk) + len(chunk)) for chunk in chunks]
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    assert all(start <= previous_end for (_, previous_end), (start, _) in zip(spans, spans[1:]))
@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("atomic_agents")
+
+from atomic_agents_pipeline.entity_graph import (  # noqa: E402
+    CanonicalEntity,
+    EntityCandidate,
+    _collapse_candidates,
+    _restore_aliases,
+)
+
+
+def test_collapse_candidates_merges_case_and_near_duplicates_of_one_type():
+    candidates = [
+        EntityCandidate(name="Joe Biden", entity_type="person", importance=0.6),
+        EntityCandidate(name="joe biden", entity_type="person", importance=0.8),
+        EntityCandidate(name="Biden Joe", entity_type="person", importance=0.3),
+        EntityCandidate(name="China", entity_type="state", importance=0.7),
+    ]
+    representatives, aliases = _collapse_candidates(candidates)
+    assert [(c.name, c.importance) for c in representatives] == [("joe biden", 0.8), ("China", 0.7)]
+    assert sorted(aliases["joe biden"]) == ["Biden Joe", "Joe Biden"]
+
+
+def test_collapse_candidates_keeps_same_name_with_different_types():
+    candidates = [
+        EntityCandidate(name="Georgia", entity_type="state", importance=0.5),
+        EntityCandidate(name="Georgia", entity_type="organization", importance=0.4),
+    ]
+    representatives, aliases = _collapse_candidates(candidates)
+    assert len(representatives) == 2
+    assert aliases == {}
+
+
+def test_restore_aliases_extends_members_without_duplicates():
+    entity = CanonicalEntity(canonical_name="Joe Biden", types=["person"], importance=0.8, members=["Joe Biden", "Biden"])
+    _restore_aliases([entity], {"Joe Biden": ["joe biden"], "Biden": ["Joe Biden"]})
+    assert entity.members == ["Joe Biden", "Biden", "joe biden"]
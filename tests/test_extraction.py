@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import aisuite
+import pytest
+
+from codex_code.extraction import AISuiteLLM, Entity, stream_entities
+from visualmind.llm_cache import SQLiteCache
+
+
+class _StreamingLLM:
+    """Stands in for AISuiteLLM, replaying a reply split into fixed chunks."""
+
+    model = "openai:gpt-4o"
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    def stream(self, system_prompt, user_prompt, **kwargs):
+        yield from self._chunks
+
+
+def test_stream_entities_reads_every_chunk_of_a_split_array():
+    reply = '{"entities": [{"name": "Ada", "type": "person", "importance": 0.9}, {"name": "ACME", "type": "organization", "importance": 0.4}]}'
+    chunks = [reply[index : index + 7] for index in range(0, len(reply), 7)]
+
+    entities = list(stream_entities("text", _StreamingLLM(chunks)))
+
+    assert entities == [Entity("Ada", "person", 0.9), Entity("ACME", "organization", 0.4)]
+
+
+def test_stream_entities_reports_truncated_streams():
+    llm = _StreamingLLM(['{"entities": [{"name": "Ada", "type": "person", "importance": 0.9}, {"name": "AC'])
+    with pytest.raises(ValueError, match="truncated or malformed"):
+        list(stream_entities("text", llm))
+
+
+class _FakeAISuiteClient:
+    """Mimics ``aisuite.Client`` with one canned reply per call."""
+
+    def __init__(self, content, finish_reason):
+        self.calls = 0
+        self._content = content
+        self._finish_reason = finish_reason
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, *, stream=False, **kwargs):
+        self.calls += 1
+        if stream:
+            delta = SimpleNamespace(content=self._content)
+            return iter([SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=self._finish_reason)])])
+        message = SimpleNamespace(content=self._content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=self._finish_reason)])
+
+
+@pytest.fixture
+def cached_llm(tmp_path, monkeypatch):
+    def build(content, finish_reason="stop"):
+        client = _FakeAISuiteClient(content, finish_reason)
+        monkeypatch.setattr(aisuite, "Client", lambda **kwargs: client)
+        return AISuiteLLM(cache=SQLiteCache(tmp_path / "cache.sqlite3")), client
+
+    return build
+
+
+def test_aisuite_llm_replays_finished_replies(cached_llm):
+    llm, client = cached_llm('{"entities": []}')
+    assert llm.complete("Be brief.", "Hi") == '{"entities": []}'
+    assert list(llm.stream("Be brief.", "Hi")) == ['{"entities": []}']
+    assert client.calls == 1
+
+
+def test_aisuite_llm_does_not_cache_truncated_replies(cached_llm):
+    llm, client = cached_llm('{"entities": [{"na', "length")
+    llm.complete("Be brief.", "Hi")
+    list(llm.stream("Be brief.", "Hi"))
+    llm.complete("Be brief.", "Hi")
+    assert client.calls == 3
+
+
+def test_aisuite_llm_raises_on_missing_content(cached_llm):
+    llm, _ = cached_llm(None, "content_filter")
+    with pytest.raises(ValueError, match="no content"):
+        llm.complete("Be brief.", "Hi")
+
+
+def test_aisuite_llm_leaves_retries_to_the_shared_helper(monkeypatch):
+    configs = []
+    monkeypatch.setattr(aisuite, "Client", lambda **kwargs: configs.append(kwargs) or _FakeAISuiteClient("", "stop"))
+    AISuiteLLM(http_client="pool")
+    assert configs == [{"provider_configs": {"openai": {"max_retries": 0, "http_client": "pool"}}}]
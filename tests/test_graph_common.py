@@ -0,0 +1,81 @@
+from scripts._graph_common import (
+    dedupe_relationships,
+    graph_data,
+    needs_synonym_merge,
+    remap_relationships,
+    union_canonical,
+    union_entities,
+)
+
+
+def _relation(source, target, relationship="owner", weight=0.5):
+    return {"source": source, "target": target, "relationship": relationship, "weight": weight}
+
+
+def test_dedupe_relationships_keeps_the_heaviest_duplicate():
+    relationships = [_relation("A", "B", weight=0.2), _relation("A", "B", weight=0.7), _relation("A", "B", "advisor", 0.1)]
+    assert dedupe_relationships(relationships) == [_relation("A", "B", weight=0.7), _relation("A", "B", "advisor", 0.1)]
+
+
+def test_union_entities_merges_on_normalised_name_and_keeps_max_importance():
+    merged = union_entities(
+        [
+            [{"name": "Joe  Biden", "type": "person", "importance": 0.4}],
+            [{"name": "joe biden", "type": "person", "importance": 0.9}, {"name": "China", "type": "state", "importance": 0.6}],
+        ]
+    )
+    assert merged == [
+        {"name": "Joe  Biden", "type": "person", "importance": 0.9},
+        {"name": "China", "type": "state", "importance": 0.6},
+    ]
+
+
+def test_union_canonical_merges_types_and_members():
+    merged = union_canonical(
+        [
+            [{"canonical_name": "China", "types": ["state"], "importance": 0.5, "members": ["China", "Xi Jinping"]}],
+            [{"canonical_name": "china ", "types": ["organization"], "importance": 0.9, "members": ["Beijing"]}],
+        ]
+    )
+    assert merged == [
+        {
+            "canonical_name": "China",
+            "types": ["state", "organization"],
+            "importance": 0.9,
+            "members": ["China", "Xi Jinping", "Beijing"],
+        }
+    ]
+
+
+def test_remap_relationships_moves_endpoints_and_drops_unresolved_and_self_loops():
+    entities = [
+        {"canonical_name": "China", "members": ["China", "Xi Jinping"]},
+        {"canonical_name": "ACME", "members": ["ACME Corp"]},
+    ]
+    relationships = [
+        _relation("xi  jinping", "ACME Corp"),
+        _relation("Xi Jinping", "China"),
+        _relation("China", "Nobody"),
+    ]
+    assert remap_relationships(entities, relationships) == [_relation("China", "ACME")]
+
+
+def test_needs_synonym_merge_only_for_similar_names():
+    assert needs_synonym_merge([{"name": "Joe Biden"}, {"name": "President Biden"}, {"name": "China"}])
+    assert not needs_synonym_merge([{"name": "Joe Biden"}, {"name": "China"}])
+    assert not needs_synonym_merge([{"name": "Joe Biden"}])
+
+
+def test_needs_synonym_merge_ignores_names_that_normalise_to_nothing():
+    names = ["!!", "??", "Joe Biden", "Biden"]
+    assert needs_synonym_merge([{"name": name} for name in names])
+    assert not needs_synonym_merge([{"name": "!!"}, {"name": "??"}])
+
+
+def test_graph_data_dedupes_edges_and_groups_by_first_type():
+    data = graph_data(
+        [{"canonical_name": "A", "types": ["person"], "importance": 0.5}, {"canonical_name": "B", "importance": 0.2}],
+        [_relation("A", "B", weight=0.2), _relation("A", "B", weight=0.8)],
+    )
+    assert [node["group"] for node in data["nodes"]] == ["person", "entity"]
+    assert data["edges"] == [{"from": "A", "to": "B", "width": 0.8, "title": "owner"}]
@@ -0,0 +1,22 @@
+from codex_code.extraction import Entity, Relationship
+from codex_code.graph_utils import build_graph, to_vis_json
+
+ENTITIES = [Entity("Ada", "person", 0.7), Entity("ACME", "organization", 0.3)]
+RELATIONSHIPS = [
+    Relationship("Ada", "ACME", "founder", 0.7),
+    Relationship("Ada", "Nobody", "advisor", 0.5),
+]
+
+
+def test_build_graph_keeps_the_model_floats():
+    graph = build_graph(ENTITIES, RELATIONSHIPS)
+    assert graph.nodes["Ada"] == {"type": "person", "importance": 0.7}
+    assert list(graph.edges(data=True)) == [("Ada", "ACME", {"relation_type": "founder", "weight": 0.7})]
+
+
+def test_to_vis_json_scales_sizes_without_float32_noise():
+    data = to_vis_json(ENTITIES, RELATIONSHIPS)
+    assert [node["value"] for node in data["nodes"]] == [31.0, 19.0]
+    assert data["edges"] == [
+        {"from": "Ada", "to": "ACME", "title": "founder (0.70)", "value": 3.8, "width": 3.8}
+    ]
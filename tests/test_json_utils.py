@@ -0,0 +1,57 @@
+import pytest
+
+from visualmind.json_utils import _balanced_slice, complete_records, parse_json_lenient
+
+
+def test_parse_json_lenient_reads_plain_json():
+    assert parse_json_lenient('[{"name": "Ada"}]') == [{"name": "Ada"}]
+
+
+def test_parse_json_lenient_unwraps_code_fences():
+    reply = 'Here you go:\n```json\n{"entities": []}\n```\nAnything else?'
+    assert parse_json_lenient(reply) == {"entities": []}
+
+
+def test_parse_json_lenient_skips_surrounding_prose():
+    reply = 'Sure! The result is [{"name": "Ada", "note": "uses [brackets]"}] as requested.'
+    assert parse_json_lenient(reply) == [{"name": "Ada", "note": "uses [brackets]"}]
+
+
+def test_parse_json_lenient_repairs_truncated_replies():
+    reply = '[{"name": "Ada", "type": "person"}, {"name": "ACME", "ty'
+    parsed = parse_json_lenient(reply)
+    assert parsed[0] == {"name": "Ada", "type": "person"}
+    assert parsed[1]["name"] == "ACME"
+
+
+def test_parse_json_lenient_returns_empty_string_for_empty_reply():
+    assert parse_json_lenient("") == ""
+
+
+def test_parse_json_lenient_rejects_replies_without_json():
+    with pytest.raises(ValueError):
+        parse_json_lenient("I cannot help with that.")
+
+
+def test_balanced_slice_ignores_brackets_inside_strings():
+    assert _balanced_slice('note: {"a": "}]", "b": [1, {"c": 2}]} trailing }') == '{"a": "}]", "b": [1, {"c": 2}]}'
+
+
+def test_balanced_slice_returns_none_when_unbalanced():
+    assert _balanced_slice('[{"a": 1}') is None
+    assert _balanced_slice("no json here") is None
+
+
+def test_complete_records_drops_partial_and_non_dict_records():
+    payload = [
+        {"source": "A", "target": "B", "relationship": "owner", "weight": 0.5},
+        {"source": "A", "target": "B"},
+        "stray",
+    ]
+    required = ("source", "target", "relationship", "weight")
+    assert complete_records(payload, required) == [payload[0]]
+
+
+def test_complete_records_rejects_non_list_payloads():
+    assert complete_records({"source": "A"}, ("source",)) == []
+    assert complete_records(None, ("source",)) == []
@@ -0,0 +1,124 @@
+from types import SimpleNamespace
+
+import pytest
+
+from visualmind.llm_cache import SemanticCache, SQLiteCache, cached_complete, cached_stream
+
+MESSAGES = [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Hi"}]
+
+VECTORS = {
+    "Ada founded ACME.": [1.0, 0.0, 0.0],
+    "Ada founded ACME!": [0.99, 0.1, 0.0],
+    "Bob sold the mill.": [0.0, 1.0, 0.0],
+}
+
+
+class _FakeClient:
+    """Mimics ``client.chat.completions.create`` with canned replies."""
+
+    def __init__(self, content=None, finish_reason="stop", chunks=()):
+        self.calls = 0
+        self._content = content
+        self._finish_reason = finish_reason
+        self._chunks = chunks
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, *, stream=False, **kwargs):
+        self.calls += 1
+        if stream:
+            return iter(self._stream())
+        message = SimpleNamespace(content=self._content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=self._finish_reason)])
+
+    def _stream(self):
+        for text in self._chunks:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text), finish_reason=None)])
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason=self._finish_reason)])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.sqlite3")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def semantic(tmp_path):
+    cache = SemanticCache(tmp_path / "cache.sqlite3", embed=VECTORS.__getitem__)
+    yield cache
+    cache.close()
+
+
+def test_sqlite_cache_ignores_surrounding_whitespace(cache):
+    cache.store("openai:m", "Be brief.", "Hi", "[]")
+    assert cache.lookup("openai:m", " Be brief.\n", "Hi  ") == "[]"
+    assert cache.lookup("openai:other", "Be brief.", "Hi") is None
+
+
+def test_sqlite_cache_persists_across_connections(tmp_path):
+    first = SQLiteCache(tmp_path / "cache.sqlite3")
+    first.store("openai:m", "Be brief.", "Hi", "[]")
+    first.close()
+    second = SQLiteCache(tmp_path / "cache.sqlite3")
+    assert second.lookup("openai:m", "Be brief.", "Hi") == "[]"
+    second.close()
+
+
+def test_semantic_cache_reuses_near_duplicate_prompts(semantic):
+    assert semantic.lookup("openai:m", "Extract.", "Ada founded ACME.") is None
+    semantic.store("openai:m", "Extract.", "Ada founded ACME.", '["Ada"]')
+    assert semantic.lookup("openai:m", "Extract.", "Ada founded ACME!") == '["Ada"]'
+    assert semantic.lookup("openai:m", "Extract.", "Bob sold the mill.") is None
+
+
+def test_semantic_cache_keeps_stages_apart(semantic):
+    semantic.store("openai:m", "Extract.", "Ada founded ACME.", '["Ada"]')
+    assert semantic.lookup("openai:m", "Relate.", "Ada founded ACME!") is None
+    assert semantic.lookup("openai:other", "Extract.", "Ada founded ACME!") is None
+
+
+def test_cached_complete_replays_finished_replies(cache):
+    client = _FakeClient("[]")
+    assert cached_complete(client, "openai:m", MESSAGES, cache=cache) == "[]"
+    assert cached_complete(client, "openai:m", MESSAGES, cache=cache) == "[]"
+    assert client.calls == 1
+
+
+def test_cached_complete_keys_on_request_arguments(cache):
+    client = _FakeClient("[]")
+    cached_complete(client, "openai:m", MESSAGES, cache=cache)
+    cached_complete(client, "openai:m", MESSAGES, cache=cache, temperature=0)
+    assert client.calls == 2
+
+
+def test_cached_complete_bypass_still_refreshes_the_cache(cache, monkeypatch):
+    cached_complete(_FakeClient("old"), "openai:m", MESSAGES, cache=cache)
+    monkeypatch.setenv("LLM_CACHE_BYPASS", "1")
+    assert cached_complete(_FakeClient("new"), "openai:m", MESSAGES, cache=cache) == "new"
+    monkeypatch.delenv("LLM_CACHE_BYPASS")
+    assert cached_complete(_FakeClient("unused"), "openai:m", MESSAGES, cache=cache) == "new"
+
+
+@pytest.mark.parametrize("content, finish_reason", [('[{"na', "length"), ("  ", "stop")])
+def test_cached_complete_skips_truncated_or_empty_replies(cache, content, finish_reason):
+    client = _FakeClient(content, finish_reason)
+    cached_complete(client, "openai:m", MESSAGES, cache=cache)
+    cached_complete(client, "openai:m", MESSAGES, cache=cache)
+    assert client.calls == 2
+
+
+def test_cached_complete_raises_on_missing_content(cache):
+    with pytest.raises(ValueError, match="no content"):
+        cached_complete(_FakeClient(None, "content_filter"), "openai:m", MESSAGES, cache=cache)
+
+
+def test_cached_stream_caches_only_streams_that_finished(cache):
+    truncated = _FakeClient(chunks=['{"entities": [', '{"na'], finish_reason="length")
+    assert "".join(cached_stream(truncated, "openai:m", MESSAGES, cache=cache)) == '{"entities": [{"na'
+    assert cache.lookup("openai:m", "Be brief.", "Hi") is None
+
+    finished = _FakeClient(chunks=['{"entities": ', "[]}"])
+    assert "".join(cached_stream(finished, "openai:m", MESSAGES, cache=cache)) == '{"entities": []}'
+    assert list(cached_stream(finished, "openai:m", MESSAGES, cache=cache)) == ['{"entities": []}']
+    assert finished.calls == 1
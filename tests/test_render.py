@@ -0,0 +1,40 @@
+import orjson
+
+from visualmind.render import VIS_CSS_INTEGRITY, VIS_JS_INTEGRITY, build_vis_data, render_to_html, write_vis_json
+
+
+def test_build_vis_data_keeps_first_node_per_id():
+    data = build_vis_data(
+        [{"id": "A", "value": 0.2}, {"id": "B"}, {"id": "A", "value": 0.9}],
+        [{"from": "A", "to": "B"}],
+    )
+    assert data["nodes"] == [{"id": "A", "value": 0.2}, {"id": "B"}]
+    assert data["edges"] == [{"from": "A", "to": "B"}]
+
+
+def test_build_vis_data_drops_edges_to_unknown_nodes():
+    data = build_vis_data([{"id": "A"}], [{"from": "A", "to": "B"}, {"from": "A", "to": "A"}])
+    assert data["edges"] == [{"from": "A", "to": "A"}]
+
+
+def test_write_vis_json_round_trips_the_payload(tmp_path):
+    data = build_vis_data([{"id": "A", "label": "数据"}], [])
+    output = tmp_path / "graph" / "output_graph.json"
+    write_vis_json(data, output)
+    assert orjson.loads(output.read_bytes()) == data
+
+
+def test_render_to_html_escapes_script_close_in_labels(tmp_path):
+    output = tmp_path / "graph.html"
+    render_to_html(build_vis_data([{"id": "A", "label": "</script>"}], []), output)
+    page = output.read_text(encoding="utf-8")
+    assert '"label":"<\\/script>"' in page
+    assert page.count("</script>") == 2
+
+
+def test_render_to_html_pins_the_cdn_bundle_with_integrity_hashes(tmp_path):
+    output = tmp_path / "graph.html"
+    render_to_html(build_vis_data([], []), output)
+    page = output.read_text(encoding="utf-8")
+    assert f'integrity="{VIS_JS_INTEGRITY}" crossorigin="anonymous"></script>' in page
+    assert f'integrity="{VIS_CSS_INTEGRITY}" crossorigin="anonymous">' in page
@@ -0,0 +1,55 @@
+import httpx
+import openai
+import pytest
+from tenacity import wait_none
+
+from visualmind.retry import _is_retryable, call_with_retry
+
+REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def _wrapped(error):
+    """Raise ``error`` and re-raise it the way aisuite does, as a new error inside ``except``."""
+    try:
+        try:
+            raise error
+        except Exception:
+            raise RuntimeError("provider call failed")
+    except RuntimeError as exc:
+        return exc
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(call_with_retry.retry, "wait", wait_none())
+
+
+def test_is_retryable_follows_the_context_chain():
+    assert _is_retryable(openai.APIConnectionError(request=REQUEST))
+    assert _is_retryable(_wrapped(openai.APITimeoutError(request=REQUEST)))
+    assert not _is_retryable(_wrapped(ValueError("bad prompt")))
+
+
+def test_call_with_retry_retries_transient_errors():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _wrapped(openai.APIConnectionError(request=REQUEST))
+        return "ok"
+
+    assert call_with_retry(flaky) == "ok"
+    assert len(calls) == 3
+
+
+def test_call_with_retry_reraises_other_errors_at_once():
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bad prompt")
+
+    with pytest.raises(ValueError):
+        call_with_retry(broken)
+    assert len(calls) == 1
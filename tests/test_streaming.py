@@ -0,0 +1,48 @@
+import ijson
+import pytest
+
+from visualmind.streaming import ChunkReader, iter_json_items
+
+PREFIXES = {"entities.item": "entities", "relationships.item": "relationships"}
+
+
+def _split(text, size):
+    return [text[index : index + size] for index in range(0, len(text), size)]
+
+
+def test_chunk_reader_probe_does_not_consume_a_chunk():
+    reader = ChunkReader(["[1,", "2]"])
+    assert reader.read(0) == b""
+    assert reader.read() == b"[1,"
+    assert reader.read() == b"2]"
+    assert reader.read() == b""
+
+
+def test_chunk_reader_skips_empty_chunks():
+    reader = ChunkReader(["", "{}", ""])
+    assert reader.read() == b"{}"
+    assert reader.read() == b""
+
+
+def test_iter_json_items_yields_items_from_several_arrays():
+    reply = (
+        '{"entities": [{"canonical_name": "Ada", "importance": 0.9}], '
+        '"relationships": [{"source": "Ada", "target": "ACME", "weight": 0.5}]}'
+    )
+    items = list(iter_json_items(_split(reply, 5), PREFIXES))
+    assert items == [
+        ("entities", {"canonical_name": "Ada", "importance": 0.9}),
+        ("relationships", {"source": "Ada", "target": "ACME", "weight": 0.5}),
+    ]
+
+
+def test_iter_json_items_yields_scalar_items():
+    assert list(iter_json_items(_split('{"entities": ["Ada", "ACME"]}', 3), PREFIXES)) == [
+        ("entities", "Ada"),
+        ("entities", "ACME"),
+    ]
+
+
+def test_iter_json_items_raises_on_malformed_input():
+    with pytest.raises(ijson.JSONError):
+        list(iter_json_items(['{"entities": [{"canonical_name": }'], PREFIXES))
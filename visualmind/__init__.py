@@ -0,0 +1,7 @@
+"""Shared infrastructure for the VisualMind pipelines.
+
+Input handling, LLM response caching, pooled HTTP clients, OpenAI Batch API
+submission, and graph rendering live here once; the pipelines under
+``atomic_agents_pipeline/``, ``codex_code/``, and ``scripts/`` keep only their
+prompts and extraction logic.
+"""
@@ -0,0 +1,136 @@
+import io
+import sys
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import orjson
+
+_CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def openai_model_name(model: str) -> str:
+    """Translate an aisuite ``provider:model`` identifier into an OpenAI model name."""
+    provider, _, name = model.partition(":")
+    if not name:
+        return provider
+    if provider != "openai":
+        raise ValueError(f"Batch mode only supports OpenAI models, got '{model}'.")
+    return name
+
+
+def build_openai_client() -> Any:
+    try:
+        from openai import OpenAI
+    except ImportError as exc:  # pragma: no cover - openai required at runtime
+        raise RuntimeError(
+            "The `openai` package is required. Install dependencies with `uv sync`."
+        ) from exc
+    return OpenAI()
+
+
+def _batch_jsonl(
+    prompts: Mapping[str, Tuple[str, str]],
+    model: str,
+    response_format: Optional[Dict[str, Any]],
+) -> bytes:
+    lines: List[bytes] = []
+    for custom_id, (system_prompt, user_prompt) in prompts.items():
+        body: Dict[str, Any] = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        }
+        if response_format is not None:
+            body["response_format"] = response_format
+        lines.append(
+            orjson.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": _CHAT_COMPLETIONS_URL,
+                    "body": body,
+                },
+                option=orjson.OPT_APPEND_NEWLINE,
+            )
+        )
+    return b"".join(lines)
+
+
+def _wait_for_batch(
+    client: Any,
+    batch_id: str,
+    *,
+    poll_interval: float,
+    max_poll_interval: float,
+) -> Any:
+    """Poll a batch with exponential backoff until it reaches a terminal status."""
+    delay = poll_interval
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in _TERMINAL_STATUSES:
+            return batch
+        time.sleep(delay)
+        delay = min(delay * 2, max_poll_interval)
+
+
+def _read_jsonl(client: Any, file_id: Optional[str]) -> List[Dict[str, Any]]:
+    if not file_id:
+        return []
+    content = client.files.content(file_id).text
+    return [orjson.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def submit_batch(
+    prompts: Mapping[str, Tuple[str, str]],
+    *,
+    model: str,
+    response_format: Optional[Dict[str, Any]] = None,
+    client: Any = None,
+    poll_interval: float = 10.0,
+    max_poll_interval: float = 300.0,
+) -> Dict[str, Any]:
+    """Run ``{custom_id: (system_prompt, user_prompt)}`` as one Batch API job.
+
+    Returns the decoded JSON payload of every successful request keyed by
+    ``custom_id``. Failed requests are reported on stderr and left out.
+    """
+    if not prompts:
+        return {}
+    client = client or build_openai_client()
+
+    upload = client.files.create(
+        file=("batch.jsonl", io.BytesIO(_batch_jsonl(prompts, openai_model_name(model), response_format))),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=upload.id,
+        endpoint=_CHAT_COMPLETIONS_URL,
+        completion_window="24h",
+    )
+    batch = _wait_for_batch(
+        client,
+        batch.id,
+        poll_interval=poll_interval,
+        max_poll_interval=max_poll_interval,
+    )
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} finished with status '{batch.status}'.")
+
+    results: Dict[str, Any] = {}
+    for record in _read_jsonl(client, batch.output_file_id):
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            print(f"{custom_id}: batch request failed: {record.get('error') or response}", file=sys.stderr)
+            continue
+        content = response["body"]["choices"][0]["message"]["content"]
+        try:
+            results[custom_id] = orjson.loads(content)
+        except (TypeError, orjson.JSONDecodeError) as exc:
+            print(f"{custom_id}: invalid JSON in batch response: {exc}", file=sys.stderr)
+    for record in _read_jsonl(client, batch.error_file_id):
+        print(f"{record.get('custom_id')}: batch request failed: {record.get('error')}", file=sys.stderr)
+    return results
@@ -0,0 +1,35 @@
+from typing import List
+
+import tiktoken
+
+
+def _encoding_for(model: str) -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(model.split(":", 1)[-1])
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = 2000,
+    overlap: int = 200,
+    *,
+    model: str = "openai:gpt-4o",
+) -> List[str]:
+    """Split text into overlapping windows of at most ``max_tokens`` tokens."""
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be non-negative and smaller than max_tokens.")
+    encoding = _encoding_for(model)
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return [text]
+    # Token windows can end inside a multi-byte character (common in Chinese text),
+    # so cut on character offsets; a split character goes whole to the later window.
+    decoded, offsets = encoding.decode_with_offsets(tokens)
+    offsets.append(len(decoded))
+    stride = max_tokens - overlap
+    return [
+        decoded[offsets[start] : offsets[min(start + max_tokens, len(tokens))]]
+        for start in range(0, len(tokens) - overlap, stride)
+    ]
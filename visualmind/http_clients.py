@@ -0,0 +1,15 @@
+import httpx
+
+# One pooled HTTP/2 connection set serves every LLM request in a run.
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+HTTP_TIMEOUT = 60.0
+
+
+def build_http_client() -> httpx.Client:
+    """Blocking pool for synchronous SDKs such as aisuite; safe to share across threads."""
+    return httpx.Client(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+
+def build_async_http_client() -> httpx.AsyncClient:
+    """Pool for ``AsyncOpenAI``; close it with ``await client.aclose()``."""
+    return httpx.AsyncClient(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
@@ -0,0 +1,33 @@
+import glob
+import mmap
+from pathlib import Path
+from typing import List
+
+# Above this size the document is decoded straight from a memory map, so the raw
+# bytes never need their own copy on the Python heap next to the decoded text.
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+
+def collect_inputs(spec: str) -> List[Path]:
+    """Resolve a file path, directory, or glob pattern to the input text files."""
+    path = Path(spec)
+    if path.is_dir():
+        return sorted(candidate for candidate in path.glob("*.txt") if candidate.is_file())
+    if path.is_file():
+        return [path]
+    return sorted(Path(match) for match in glob.glob(spec, recursive=True) if Path(match).is_file())
+
+
+def output_path_for(output: Path, source: Path, multiple: bool) -> Path:
+    """Keep the configured output for single runs; prefix it with the input stem otherwise."""
+    if not multiple:
+        return output
+    return output.with_name(f"{source.stem}_{output.name}")
+
+
+def read_document(path: Path) -> str:
+    """Read a UTF-8 document and strip surrounding whitespace."""
+    if path.stat().st_size < MMAP_THRESHOLD:
+        return path.read_bytes().decode("utf-8").strip()
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return str(mapped, "utf-8").strip()
@@ -0,0 +1,78 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+import json_repair
+import orjson
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL | re.IGNORECASE)
+_CLOSERS = {"[": "]", "{": "}"}
+
+
+def _balanced_slice(text: str) -> Optional[str]:
+    """Return the first complete JSON array/object in ``text``, if there is one."""
+    starts = [index for index in (text.find("["), text.find("{")) if index != -1]
+    if not starts:
+        return None
+    start = min(starts)
+    stack = []
+    in_string = escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif stack and char == stack[-1]:
+            stack.pop()
+            if not stack:
+                return text[start : index + 1]
+    return None
+
+
+def parse_json_lenient(text: str) -> Any:
+    """Parse an LLM reply that should be JSON but may carry fences, prose, or truncation.
+
+    Tries, in order: the reply as-is, the body of a ```json fence, the first
+    balanced array/object, and finally ``json_repair``. Raises ``ValueError``
+    when nothing JSON-like can be recovered.
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    candidate = _balanced_slice(text)
+    if candidate is not None:
+        try:
+            return orjson.loads(candidate)
+        except orjson.JSONDecodeError:
+            pass
+    repaired = json_repair.loads(text)
+    if repaired == "" and text.strip():
+        raise ValueError("LLM response does not contain recoverable JSON.")
+    return repaired
+
+
+def complete_records(payload: Any, required_keys: Iterable[str]) -> List[Dict[str, Any]]:
+    """Keep the objects of a parsed JSON array that carry every required key.
+
+    ``json_repair`` turns a truncated tail into a partial record, and a reply can
+    be the wrong shape altogether; a non-list payload yields ``[]``.
+    """
+    if not isinstance(payload, list):
+        return []
+    required_keys = tuple(required_keys)
+    return [
+        record
+        for record in payload
+        if isinstance(record, dict) and all(key in record for key in required_keys)
+    ]
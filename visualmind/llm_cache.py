@@ -0,0 +1,281 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import orjson
+
+from visualmind.retry import CHAT_TIMEOUT, call_with_retry
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key_sha256 BLOB PRIMARY KEY,
+    model TEXT,
+    system TEXT,
+    user TEXT,
+    response TEXT NOT NULL,
+    embedding BLOB
+)
+"""
+
+
+def cache_key(model: str, system_prompt: str, user_prompt: str) -> bytes:
+    """Hash a prompt triple; surrounding whitespace does not change the key."""
+    payload = f"{model}\n{system_prompt.strip()}\n{user_prompt.strip()}"
+    return hashlib.sha256(payload.encode("utf-8")).digest()
+
+
+class SQLiteCache:
+    """Exact-match LLM response cache persisted in a single SQLite file.
+
+    ``get``/``set`` follow instructor's cache protocol, so the same file can
+    back ``instructor.from_openai(..., cache=...)`` as well as AISuiteLLM.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(_SCHEMA)
+
+    def _select(self, key: bytes) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE key_sha256 = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _insert(
+        self,
+        key: bytes,
+        response: str,
+        *,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+        user_prompt: Optional[str] = None,
+        embedding: Optional[bytes] = None,
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, system_prompt, user_prompt, response, embedding),
+            )
+
+    def lookup(self, model: str, system_prompt: str, user_prompt: str) -> Optional[str]:
+        """Return the cached response for this exact prompt, if any."""
+        return self._select(cache_key(model, system_prompt, user_prompt))
+
+    def store(self, model: str, system_prompt: str, user_prompt: str, response: str) -> None:
+        """Record a response for later lookups."""
+        self._insert(
+            cache_key(model, system_prompt, user_prompt),
+            response,
+            model=model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """instructor cache hook: look up an opaque key."""
+        return self._select(hashlib.sha256(key.encode("utf-8")).digest())
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> None:
+        """instructor cache hook: store under an opaque key (``ttl`` is ignored)."""
+        self._insert(hashlib.sha256(key.encode("utf-8")).digest(), value)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def cached_complete(
+    client: Any,
+    model: str,
+    messages: Sequence[Mapping[str, str]],
+    *,
+    cache: Optional[SQLiteCache],
+    timeout: float = CHAT_TIMEOUT,
+    **kwargs: Any,
+) -> str:
+    """Return the text of ``client.chat.completions.create``, replaying cached replies.
+
+    Works with aisuite and OpenAI clients. Extra ``kwargs`` are forwarded to the
+    call and are part of the cache key; ``timeout`` is not. Transient API errors
+    are retried with backoff. Only non-empty replies that finished with
+    ``"stop"`` are cached; a reply without content raises ``ValueError``. Set
+    ``LLM_CACHE_BYPASS=1`` to always call the API; fresh replies still overwrite
+    the cached ones.
+    """
+    prompt = _chat_prompt(model, messages, kwargs)
+    if cache is not None and os.getenv("LLM_CACHE_BYPASS") != "1":
+        cached = cache.lookup(*prompt)
+        if cached is not None:
+            return cached
+
+    response = call_with_retry(
+        client.chat.completions.create, model=model, messages=list(messages), timeout=timeout, **kwargs
+    )
+    choice = response.choices[0]
+    content = choice.message.content
+    finish_reason = getattr(choice, "finish_reason", None)
+    if content is None:
+        raise ValueError(f"{model} returned no content (finish_reason={finish_reason!r}).")
+    if cache is not None and _is_cacheable(content, finish_reason):
+        cache.store(*prompt, content)
+    return content
+
+
+def cached_stream(
+    client: Any,
+    model: str,
+    messages: Sequence[Mapping[str, str]],
+    *,
+    cache: Optional[SQLiteCache],
+    timeout: float = CHAT_TIMEOUT,
+    **kwargs: Any,
+) -> Iterator[str]:
+    """Streaming counterpart of :func:`cached_complete`; yields text deltas.
+
+    A cache hit is replayed as a single chunk. The full reply is stored only once
+    the stream has been consumed to the end and finished normally.
+    """
+    prompt = _chat_prompt(model, messages, kwargs)
+    if cache is not None and os.getenv("LLM_CACHE_BYPASS") != "1":
+        cached = cache.lookup(*prompt)
+        if cached is not None:
+            yield cached
+            return
+
+    # Only opening the stream is retried; a failure mid-stream propagates.
+    response = call_with_retry(
+        client.chat.completions.create,
+        model=model,
+        messages=list(messages),
+        stream=True,
+        timeout=timeout,
+        **kwargs,
+    )
+    received: List[str] = []
+    finish_reason = None
+    for chunk in response:
+        choices = getattr(chunk, "choices", None)
+        if not choices:
+            continue
+        finish_reason = getattr(choices[0], "finish_reason", None) or finish_reason
+        text = getattr(getattr(choices[0], "delta", None), "content", None)
+        if text:
+            received.append(text)
+            yield text
+    content = "".join(received)
+    if cache is not None and _is_cacheable(content, finish_reason):
+        cache.store(*prompt, content)
+
+
+def _is_cacheable(content: str, finish_reason: Optional[str]) -> bool:
+    # A reply cut off at the token limit, filtered, or empty would otherwise be
+    # replayed on every rerun.
+    return finish_reason == "stop" and bool(content.strip())
+
+
+def _chat_prompt(
+    model: str, messages: Sequence[Mapping[str, str]], kwargs: Mapping[str, Any]
+) -> Tuple[str, str, str]:
+    """Flatten a chat request into the (model, system, user) triple used as cache key."""
+    system_prompt = "\n".join(m["content"] for m in messages if m["role"] == "system")
+    user_prompt = "\n".join(m["content"] for m in messages if m["role"] != "system")
+    if kwargs:
+        model = f"{model}#{orjson.dumps(dict(kwargs), option=orjson.OPT_SORT_KEYS).decode()}"
+    return model, system_prompt, user_prompt
+
+
+def _openai_embedder(model: str = "text-embedding-3-small") -> Callable[[str], Sequence[float]]:
+    try:
+        from openai import OpenAI
+    except ImportError as exc:  # pragma: no cover - openai required at runtime
+        raise RuntimeError(
+            "The `openai` package is required. Install dependencies with `uv sync`."
+        ) from exc
+    client = OpenAI()
+
+    def embed(text: str) -> Sequence[float]:
+        return client.embeddings.create(model=model, input=text).data[0].embedding
+
+    return embed
+
+
+class SemanticCache(SQLiteCache):
+    """SQLiteCache that falls back to embedding similarity on an exact miss.
+
+    Only responses produced by the same model and system prompt are
+    candidates, so a near-duplicate document never borrows another stage's
+    answer.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        embed: Optional[Callable[[str], Sequence[float]]] = None,
+        threshold: float = 0.97,
+    ):
+        super().__init__(path)
+        self._embed = embed or _openai_embedder()
+        self._threshold = threshold
+        self._pending: Dict[bytes, bytes] = {}
+        self._groups: Dict[Tuple[str, str], Tuple[List[np.ndarray], List[str]]] = {}
+
+    def _embedding(self, text: str) -> np.ndarray:
+        vector = np.asarray(self._embed(text), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _group(self, model: str, system_prompt: str) -> Tuple[List[np.ndarray], List[str]]:
+        group_key = (model, system_prompt)
+        if group_key not in self._groups:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT embedding, response FROM llm_cache "
+                    "WHERE model = ? AND system = ? AND embedding IS NOT NULL",
+                    (model, system_prompt),
+                ).fetchall()
+            self._groups[group_key] = (
+                [np.frombuffer(blob, dtype=np.float32) for blob, _ in rows],
+                [response for _, response in rows],
+            )
+        return self._groups[group_key]
+
+    def lookup(self, model: str, system_prompt: str, user_prompt: str) -> Optional[str]:
+        cached = super().lookup(model, system_prompt, user_prompt)
+        if cached is not None:
+            return cached
+
+        vector = self._embedding(user_prompt)
+        self._pending[cache_key(model, system_prompt, user_prompt)] = vector.tobytes()
+        vectors, responses = self._group(model, system_prompt)
+        if not vectors:
+            return None
+        scores = np.stack(vectors) @ vector
+        best = int(np.argmax(scores))
+        return responses[best] if scores[best] >= self._threshold else None
+
+    def store(self, model: str, system_prompt: str, user_prompt: str, response: str) -> None:
+        key = cache_key(model, system_prompt, user_prompt)
+        embedding = self._pending.pop(key, None)
+        if embedding is None:
+            embedding = self._embedding(user_prompt).tobytes()
+        vectors, responses = self._group(model, system_prompt)
+        self._insert(
+            key,
+            response,
+            model=model,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            embedding=embedding,
+        )
+        vectors.append(np.frombuffer(embedding, dtype=np.float32))
+        responses.append(response)
@@ -0,0 +1,72 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Union
+
+import orjson
+
+VisData = Dict[str, List[Dict[str, Any]]]
+
+# cdnjs publishes Subresource Integrity hashes for this build, so the browser refuses
+# a bundle that was tampered with on the CDN. The dist build needs its stylesheet.
+VIS_JS_URL = "https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js"
+VIS_JS_INTEGRITY = "sha512-LnvoEWDFrqGHlHmDD2101OrLcbsfkrzoSpvtSQtxK3RMnRV0eOkhhBN2dXHKRrUU8p2DGRTk35n4O8nWSVe1mQ=="
+VIS_CSS_URL = "https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css"
+VIS_CSS_INTEGRITY = "sha512-WgxfT5LWjfszlPHXRmBWHkV2eceiWTOBvrKCNbdgDYTHrT2AeLCGbF4sZlZw3UMN3WtL0tGUoIAKsu8mllg/XA=="
+_TEMPLATE_DIR = Path(__file__).parent / "templates"
+
+
+def build_vis_data(nodes: Sequence[Dict[str, Any]], edges: Iterable[Dict[str, Any]]) -> VisData:
+    """Assemble a vis-network ``{"nodes": [...], "edges": [...]}`` payload.
+
+    Every node needs an ``id`` and every edge ``from``/``to``; the remaining keys
+    are vis-network options (``label``, ``title``, ``value``, ``width``, ...).
+    Repeated node ids keep their first occurrence, since ``vis.DataSet`` rejects
+    duplicates. Edges referencing unknown nodes are dropped.
+    """
+    unique_nodes: Dict[Any, Dict[str, Any]] = {}
+    for node in nodes:
+        unique_nodes.setdefault(node["id"], node)
+    known_nodes = frozenset(unique_nodes)
+    return {
+        "nodes": list(unique_nodes.values()),
+        "edges": [edge for edge in edges if edge["from"] in known_nodes and edge["to"] in known_nodes],
+    }
+
+
+def write_vis_json(data: VisData, output_path: Union[str, Path]) -> None:
+    """Write the payload as compact JSON, ready for ``new vis.Network(el, data)``."""
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE))
+
+
+def _script_json(items: List[Dict[str, Any]]) -> str:
+    # Labels come from model output; keep a stray "</script>" from closing the tag.
+    return orjson.dumps(items).decode("utf-8").replace("</", "<\\/")
+
+
+def render_to_html(
+    data: VisData,
+    output_path: Union[str, Path],
+    *,
+    height: str = "600px",
+    width: str = "100%",
+) -> None:
+    """Write the payload as a standalone vis-network HTML page."""
+    # Imported here so JSON-only runs never load Jinja.
+    import jinja2
+
+    environment = jinja2.Environment(loader=jinja2.FileSystemLoader(_TEMPLATE_DIR))
+    page = environment.get_template("vis_graph.html.j2").render(
+        vis_js_url=VIS_JS_URL,
+        vis_js_integrity=VIS_JS_INTEGRITY,
+        vis_css_url=VIS_CSS_URL,
+        vis_css_integrity=VIS_CSS_INTEGRITY,
+        nodes_json=_script_json(data["nodes"]),
+        edges_json=_script_json(data["edges"]),
+        height=height,
+        width=width,
+    )
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(page, encoding="utf-8")
@@ -0,0 +1,37 @@
+from typing import Any, Callable, TypeVar
+
+import openai
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+T = TypeVar("T")
+
+CHAT_TIMEOUT = 30.0
+IMAGE_TIMEOUT = 120.0
+
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    # aisuite re-raises provider errors as LLMError inside an ``except`` block,
+    # so the OpenAI exception is on the context chain rather than the error itself.
+    while exc is not None:
+        if isinstance(exc, _RETRYABLE_ERRORS):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+@retry(
+    retry=retry_if_exception(_is_retryable),
+    wait=wait_random_exponential(min=1, max=20),
+    stop=stop_after_attempt(6),
+    reraise=True,
+)
+def call_with_retry(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call ``fn``, retrying rate limits, timeouts, connection and 5xx errors with jittered backoff."""
+    return fn(*args, **kwargs)
@@ -0,0 +1,45 @@
+from typing import Any, Iterable, Iterator, Mapping, Tuple
+
+import ijson
+
+
+class ChunkReader:
+    """Minimal file-like view over text chunks, as consumed by ijson."""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+
+    def read(self, size: int = -1) -> bytes:
+        # ijson probes the stream type with read(0); that must not consume a chunk.
+        if size == 0:
+            return b""
+        for chunk in self._chunks:
+            if chunk:
+                return chunk.encode("utf-8")
+        return b""
+
+
+def iter_json_items(chunks: Iterable[str], prefixes: Mapping[str, str]) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(name, item)`` for every element under one of several ijson prefixes.
+
+    ``prefixes`` maps an ijson prefix (e.g. ``"entities.item"``) to the name
+    reported with its items. Each item is yielded as soon as it closes, so one
+    streamed object can carry several arrays. Raises ``ijson.JSONError`` on
+    malformed input.
+    """
+    builder = None
+    current = None
+    for prefix, event, value in ijson.parse(ChunkReader(chunks), use_float=True):
+        if builder is None:
+            if prefix in prefixes and event in ("start_map", "start_array"):
+                builder = ijson.ObjectBuilder()
+                current = prefix
+                builder.event(event, value)
+            elif prefix in prefixes and event not in ("end_map", "end_array"):
+                yield prefixes[prefix], value
+            continue
+        builder.event(event, value)
+        if prefix == current and event in ("end_map", "end_array"):
+            yield prefixes[current], builder.value
+            builder = None
+            current = None